@@ -0,0 +1,61 @@
+"""Compare IOProfile's on real archives.
+
+Run it against archives on the storage you care about (NFS, SMB, local disk):
+
+    python3 benchmarks/io_profiles.py /mnt/artifacts/*.whl /mnt/artifacts/*.tar.gz
+
+For every profile it measures listing all members and reading one member.
+Before every run the page cache for the archive is dropped with
+`posix_fadvise(DONTNEED)` (where supported), so the numbers include real I/O.
+"""
+# built-in
+import os
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+# project
+from dephell_archive import PROFILES, ArchivePath
+
+
+def drop_cache(path: Path) -> None:
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    with path.open('rb') as stream:
+        os.posix_fadvise(stream.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def run(archive_path: Path, profile: str) -> float:
+    drop_cache(archive_path)
+    start = perf_counter()
+    with TemporaryDirectory() as cache:
+        path = ArchivePath(archive_path=archive_path, cache_path=Path(cache), io_profile=profile)
+        with path.get_descriptor():
+            files = [subpath for subpath in path.iterdir() if subpath.is_file()]
+            if files:
+                files[-1].read_bytes()
+    return perf_counter() - start
+
+
+def main(argv) -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('archives', nargs='+', type=Path)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print('{:<12} {:>10} {:>10}'.format('profile', 'best, ms', 'total, ms'))
+    for profile in sorted(PROFILES):
+        best = 0.0
+        total = 0.0
+        for archive_path in args.archives:
+            timings = [run(archive_path, profile) for _ in range(args.repeat)]
+            best += min(timings)
+            total += sum(timings) / len(timings)
+        print('{:<12} {:>10.1f} {:>10.1f}'.format(profile, best * 1000, total * 1000))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+"""Memory and time of listing archives with many members.
+
+    python3 benchmarks/listing_scale.py --sizes 10000 100000 1000000
+
+For every size it generates a zip archive with empty members and compares
+the listing used before (ZipFile.infolist() and sets of names)
+with ArchivePath.iterdir() on top of MemberTable.
+Memory is the peak measured by tracemalloc.
+"""
+# built-in
+import sys
+import tracemalloc
+import zipfile
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+# project
+from dephell_archive import ArchivePath
+
+
+def make_archive(path: Path, size: int) -> None:
+    with zipfile.ZipFile(str(path), mode='w', compression=zipfile.ZIP_STORED) as descriptor:
+        for number in range(size):
+            name = 'dataset/part-{}/chunk-{}/sample-{}.npy'.format(number // 100000, number // 1000, number)
+            descriptor.writestr(name, b'')
+
+
+def list_infolist(path: Path) -> int:
+    # the way iterdir worked before MemberTable
+    with zipfile.ZipFile(str(path)) as descriptor:
+        members = descriptor.infolist()
+        names = {member.filename.rstrip('/') for member in members}
+        dirs = {name.rpartition('/')[0] for name in names}
+        return len(members) + len(dirs)
+
+
+def list_table(path: Path) -> int:
+    with TemporaryDirectory() as cache:
+        archive = ArchivePath(archive_path=path, cache_path=Path(cache))
+        count = 0
+        for _ in archive.iterdir():
+            count += 1
+        return count
+
+
+def measure(func, path: Path):
+    tracemalloc.start()
+    start = perf_counter()
+    func(path)
+    elapsed = perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv) -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10 ** 4, 10 ** 5, 10 ** 6])
+    args = parser.parse_args(argv)
+
+    print('{:>10} {:>14} {:>12} {:>14} {:>12}'.format('members', 'infolist, MB', 'time, s', 'table, MB', 'time, s'))
+    with TemporaryDirectory() as root:
+        for size in args.sizes:
+            path = Path(root, '{}.zip'.format(size))
+            make_archive(path=path, size=size)
+            old_time, old_memory = measure(list_infolist, path)
+            new_time, new_memory = measure(list_table, path)
+            print('{:>10} {:>14.1f} {:>12.2f} {:>14.1f} {:>12.2f}'.format(
+                size, old_memory / 2 ** 20, old_time, new_memory / 2 ** 20, new_time,
+            ))
+            path.unlink()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,27 @@
 # app
 from ._path import ArchivePath
+from ._scan import ScanResult, scan
+from ._source import PROFILES, BufferSource, FileSource, HTTPSource, IOProfile
 from ._stream import ArchiveStream
+from ._streaming import MemberStat, iter_tar_stream
+from ._trace import trace
 
 
 __version__ = '0.1.7'
 __author__ = 'Gram (@orsinium)'
 __license__ = 'MIT'
 
-__all__ = ['ArchivePath', 'ArchiveStream']
+__all__ = [
+    'ArchivePath',
+    'ArchiveStream',
+    'BufferSource',
+    'FileSource',
+    'HTTPSource',
+    'IOProfile',
+    'MemberStat',
+    'PROFILES',
+    'ScanResult',
+    'iter_tar_stream',
+    'scan',
+    'trace',
+]
@@ -0,0 +1,17 @@
+# built-in
+import sys
+
+# app
+from ._replay import main
+
+
+COMMANDS = {
+    'replay': main,
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print('usage: python3 -m dephell_archive {' + ','.join(COMMANDS) + '} ...', file=sys.stderr)
+        sys.exit(2)
+    sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
@@ -0,0 +1,141 @@
+# built-in
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Set
+
+# app
+from ._tar import iter_members
+
+
+def _dir_list(filelist: List[str]) -> Set[str]:
+    # paths starting with '/' or containing '.' are not supported
+    dir_list = set()  # type: Set[str]
+    for path in filelist:
+        while path:
+            path, _, _ = path.rpartition('/')
+            if not path or path in dir_list:
+                break
+            dir_list.add(path)
+    return dir_list
+
+
+def normalize(name: str) -> str:
+    """Canonical member path: without './' prefix and trailing slash.
+    """
+    while name.startswith('./'):
+        name = name[2:]
+    if name == '.':
+        return ''
+    return name.rstrip('/')
+
+
+def get_name(entry) -> str:
+    return getattr(entry, 'name', None) or entry.filename
+
+
+def is_dir_entry(entry) -> bool:
+    if hasattr(entry, 'isdir'):
+        return entry.isdir()            # tar
+    return entry.filename[-1] == '/'    # zip
+
+
+def is_file_entry(entry) -> bool:
+    if hasattr(entry, 'isfile'):
+        return entry.isfile()           # tar
+    return entry.filename[-1] != '/'    # zip
+
+
+class MemberIndex:
+    """Lookup table from canonical member path to the archive entry.
+
+    It's built once per archive and shared between all ArchivePath
+    objects derived from the same root. Zip archives are indexed at once
+    from the central directory. Tar archives are indexed incrementally
+    while looking for a member, so the scan stops at the first match.
+    The next scan continues from the same header, even with a new descriptor.
+    The descriptor is used only when the index has to be extended.
+    """
+
+    def __init__(self) -> None:
+        self.entries = dict()  # type: Dict[str, object]
+        # all parent dirs of entries, including implicit ones
+        self.dirs = set()  # type: Set[str]
+        # is all the archive indexed
+        self.complete = False
+        # how many tar members are already indexed
+        self.scanned = 0
+        # offset of the first not indexed tar header
+        self.offset = 0
+
+    def _add(self, entry) -> str:
+        name = normalize(get_name(entry))
+        self.entries.setdefault(name, entry)
+        self.dirs.update(_dir_list([name]))
+        return name
+
+    def _scan(self, descriptor, until: Optional[Callable[[str], bool]] = None) -> None:
+        """Index members until one of them matches `until`.
+        """
+        if not hasattr(descriptor, 'getmembers'):
+            # zip
+            for info in descriptor.infolist():
+                self._add(info)
+            self.complete = True
+            return
+
+        for member, offset in iter_members(descriptor, offset=self.offset):
+            name = self._add(member)
+            self.offset = offset
+            self.scanned += 1
+            if until is not None and until(name):
+                return
+        self.complete = True
+
+    def load(self, descriptor) -> 'MemberIndex':
+        if not self.complete:
+            self._scan(descriptor=descriptor)
+        return self
+
+    def get(self, descriptor, path: str):
+        path = normalize(path)
+        entry = self.entries.get(path)
+        if entry is None and not self.complete:
+            self._scan(descriptor=descriptor, until=path.__eq__)
+            entry = self.entries.get(path)
+        return entry
+
+    def find(self, descriptor, match: Callable[[str], bool]):
+        """Get the first entry which path matches the predicate.
+        """
+        for path, entry in self.entries.items():
+            if match(path):
+                return entry
+        if self.complete:
+            return None
+        known = len(self.entries)
+        self._scan(descriptor=descriptor, until=match)
+        # only new entries can match
+        for path, entry in islice(self.entries.items(), known, None):
+            if match(path):
+                return entry
+        return None
+
+    def is_implicit_dir(self, descriptor, path: str) -> bool:
+        path = normalize(path)
+        if path not in self.dirs and not self.complete:
+            self._scan(descriptor=descriptor)
+        return path in self.dirs
+
+    def is_file(self, descriptor, path: str) -> bool:
+        entry = self.get(descriptor=descriptor, path=path)
+        if entry is None:
+            return False
+        return is_file_entry(entry)
+
+    def is_dir(self, descriptor, path: str) -> bool:
+        entry = self.get(descriptor=descriptor, path=path)
+        if entry is None:
+            return self.is_implicit_dir(descriptor=descriptor, path=path)
+        return is_dir_entry(entry)
+
+    def exists(self, descriptor, path: str) -> bool:
+        return self.is_file(descriptor=descriptor, path=path) or self.is_dir(descriptor=descriptor, path=path)
@@ -0,0 +1,109 @@
+# built-in
+from sys import intern
+from typing import Dict, Iterator, List, Tuple
+
+# app
+from ._index import normalize
+
+
+class MemberTable:
+    """Compact listing of archive members.
+
+    Instead of `ZipInfo`/`TarInfo` objects and sets of names, every member
+    takes an entry in a few typed arrays: parent dir id, end of the name
+    in the shared UTF-8 names blob, offset in the archive, size, and dir flag.
+    Dir paths are interned and stored once, so the common prefixes
+    of millions of members cost nothing. All parents of members are registered
+    as dirs, so implicit dirs need no extra pass.
+    """
+
+    def __init__(self) -> None:
+        # import it only when needed, listing is built only on iterdir
+        from array import array
+
+        self.dirs = ['']  # type: List[str]
+        self.dir_ids = {'': 0}  # type: Dict[str, int]
+        self.dir_parents = array('I', [0])
+        self.dir_flags = array('B', [0])  # 1 for dirs with explicit entry
+
+        self.parents = array('I')
+        self.name_ends = array('Q')
+        self.names = bytearray()
+        self.offsets = array('Q')
+        self.sizes = array('Q')
+        self.flags = array('B')   # 1 for explicit dir entries
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def _get_dir_id(self, path: str) -> int:
+        dir_id = self.dir_ids.get(path)
+        if dir_id is not None:
+            return dir_id
+        parent, _sep, _name = path.rpartition('/')
+        parent_id = self._get_dir_id(parent)
+        path = intern(path)
+        dir_id = len(self.dirs)
+        self.dirs.append(path)
+        self.dir_ids[path] = dir_id
+        self.dir_parents.append(parent_id)
+        self.dir_flags.append(0)
+        return dir_id
+
+    def add(self, name: str, offset: int = 0, size: int = 0, is_dir: bool = False) -> None:
+        name = normalize(name)
+        if not name:
+            return
+        parent, _sep, base = name.rpartition('/')
+        if is_dir:
+            self.dir_flags[self._get_dir_id(name)] = 1
+        self.parents.append(self._get_dir_id(parent))
+        self.names += base.encode('utf-8')
+        self.name_ends.append(len(self.names))
+        self.offsets.append(offset)
+        self.sizes.append(size)
+        self.flags.append(1 if is_dir else 0)
+
+    def get_path(self, number: int) -> str:
+        start = self.name_ends[number - 1] if number else 0
+        name = str(self.names[start:self.name_ends[number]], 'utf-8')
+        parent = self.dirs[self.parents[number]]
+        if not parent:
+            return name
+        return parent + '/' + name
+
+    def _get_subdirs(self, prefix: str) -> List[bool]:
+        """For every dir, is it inside of the prefix (or the prefix itself).
+        """
+        inside = [not prefix] * len(self.dirs)
+        if not prefix:
+            return inside
+        root_id = self.dir_ids.get(prefix)
+        if root_id is None:
+            return inside
+        inside[root_id] = True
+        # parent always registered before child
+        for dir_id in range(root_id + 1, len(self.dirs)):
+            inside[dir_id] = inside[self.dir_parents[dir_id]]
+        return inside
+
+    def iter_members(self, prefix: str = '') -> Iterator[Tuple[str, bool]]:
+        """Yields relative paths and dir flags of members inside of the prefix.
+        """
+        prefix = normalize(prefix)
+        inside = self._get_subdirs(prefix)
+        cut = len(prefix) + 1 if prefix else 0
+        for number in range(len(self)):
+            if not inside[self.parents[number]]:
+                continue
+            yield self.get_path(number)[cut:], bool(self.flags[number])
+
+    def iter_implicit_dirs(self, prefix: str = '') -> Iterator[str]:
+        """Yields relative paths of dirs without own entry inside of the prefix.
+        """
+        prefix = normalize(prefix)
+        inside = self._get_subdirs(prefix)
+        cut = len(prefix) + 1 if prefix else 0
+        for dir_id, path in enumerate(self.dirs):
+            if inside[dir_id] and not self.dir_flags[dir_id] and path != prefix:
+                yield path[cut:]
@@ -1,39 +1,91 @@
 # built-in
 from contextlib import contextmanager, suppress
 from pathlib import Path, PurePath
-from tarfile import TarFile
-from typing import Callable, Iterator, List, Optional, Set, Tuple, Union
-from zipfile import ZipFile
-
-# external
-import attr
+from time import monotonic
+from typing import IO, Callable, Iterator, List, Optional, Set, Tuple, Union
 
 # app
 from ._glob import glob_path
+from ._index import MemberIndex
+from ._listing import MemberTable
+from ._source import FileSource, IOProfile, get_profile
+from ._state import (
+    MANIFESTS_DIR, ArchiveState, add_to_cache, check_cache, get_identity, get_stamp, get_state, remove_member,
+)
 from ._stream import ArchiveStream
+from ._trace import traced, traced_context, traced_iterator
+from ._zip import iter_central_directory
 
 
-EXTRACTORS = {
-    '.zip': ZipFile,
-    '.whl': ZipFile,
+# zipfile and tarfile (with gzip, bz2, and lzma) are imported
+# only when an archive of the format is opened.
+
+def _zip_open(name: str, mode: str = 'r', fileobj=None):
+    from zipfile import ZipFile
+    return ZipFile(fileobj or name, mode=mode)  # type: ignore
 
+
+def _tar_opener(method: str) -> Callable:
     # idk why this is not included in typeshed and python docs,
     # but these methods always been here from initial implementation
-    '.tar': TarFile.taropen,        # type: ignore
-    '.tgz': TarFile.gzopen,         # type: ignore
-    '.tar.gz': TarFile.gzopen,      # type: ignore
-    '.tar.bz2': TarFile.bz2open,    # type: ignore
-    '.tar.xz': TarFile.xzopen,      # type: ignore
+    def tar_open(name: str, mode: str = 'r', fileobj=None):
+        from tarfile import TarFile
+        return getattr(TarFile, method)(name, mode, fileobj)
+    return tar_open
+
+
+EXTRACTORS = {
+    '.zip': _zip_open,
+    '.whl': _zip_open,
+
+    '.tar': _tar_opener('taropen'),
+    '.tgz': _tar_opener('gzopen'),
+    '.tar.gz': _tar_opener('gzopen'),
+    '.tar.bz2': _tar_opener('bz2open'),
+    '.tar.xz': _tar_opener('xzopen'),
 }
 
 
-@attr.s()
-class ArchivePath:
-    archive_path = attr.ib(type=Path)
-    cache_path = attr.ib(type=Path)
-    member_path = attr.ib(type=PurePath, factory=PurePath)
+def _is_wheel_metadata(path: str) -> bool:
+    # {distribution}-{version}.dist-info/METADATA
+    parts = path.split('/')
+    return len(parts) == 2 and parts[0].endswith('.dist-info') and parts[1] == 'METADATA'
+
+
+def _is_sdist_metadata(path: str) -> bool:
+    # {distribution}-{version}/PKG-INFO, but not {distribution}.egg-info/PKG-INFO
+    parts = path.split('/')
+    if len(parts) > 2 or parts[-1] != 'PKG-INFO':
+        return False
+    return not parts[0].endswith('.egg-info')
 
-    _descriptor = attr.ib(default=None, repr=False)
+
+class ArchivePath:
+    def __init__(self, archive_path: Path, cache_path: Path, member_path: Optional[PurePath] = None,
+                 descriptor=None, *, source=None, io_profile: Union[IOProfile, str, None] = None,
+                 check_interval: Optional[float] = None, hash_content: bool = False,
+                 state: Optional[ArchiveState] = None) -> None:
+        self.archive_path = archive_path
+        self.cache_path = cache_path
+        self.member_path = PurePath() if member_path is None else member_path
+        # where to read the archive from, `archive_path` by default
+        self.source = source
+        # IOProfile or name of one of PROFILES
+        self.io_profile = io_profile
+        # how often (in seconds) to check that the archive file is not changed,
+        # None to never check. Files in `cache_path` extracted from another version
+        # of the archive are removed. Extracted files are tracked only if it is set.
+        self.check_interval = check_interval
+        # identify tar archives by the digest of the whole file, not by the file stat,
+        # so copies of the archive share the state. It's slow for big archives.
+        self.hash_content = hash_content
+
+        self._descriptor = descriptor
+        # members index and extraction cache, shared between all archives
+        # with the same content. For local files it is resolved on demand.
+        if state is None and source is not None:
+            state = ArchiveState()
+        self._state = state
 
     # properties
 
@@ -41,6 +93,18 @@ class ArchivePath:
     def _is_root(self) -> bool:
         return self.member_path.name == ''
 
+    @property
+    def _cached_path(self) -> Optional[Path]:
+        """Path to the member in the cache dir, None for the dir with manifests.
+        """
+        if self.member_path.parts[:1] == (MANIFESTS_DIR, ):
+            return None
+        return self.cache_path / self.member_path
+
+    @property
+    def _index(self) -> MemberIndex:
+        return self._get_state().index
+
     @property
     def extractor(self) -> Callable:
         extension = ''
@@ -103,6 +167,13 @@ class ArchivePath:
 
     # context managers
 
+    def _open_source(self) -> IO[bytes]:
+        source = self.source
+        if source is None:
+            source = FileSource(path=self.archive_path)
+        return source.open(profile=get_profile(self.io_profile))
+
+    @traced_context('get_descriptor')
     @contextmanager
     def get_descriptor(self):
         if self._descriptor is not None:
@@ -114,14 +185,16 @@ class ArchivePath:
                 yield self._descriptor
                 return
 
-        with self.extractor(str(self.archive_path)) as descriptor:
-            self._descriptor = descriptor
-            try:
-                yield self._descriptor
-            except Exception:
-                self._descriptor = None
-                raise
+        with self._open_source() as stream:
+            with self.extractor(str(self.archive_path), fileobj=stream) as descriptor:
+                self._descriptor = descriptor
+                try:
+                    yield self._descriptor
+                except Exception:
+                    self._descriptor = None
+                    raise
 
+    @traced_context('open')
     @contextmanager
     def open(self, mode: str = 'r', encoding=None):
         if 'w' in mode:
@@ -131,21 +204,48 @@ class ArchivePath:
             raise IsADirectoryError
 
         # read from cache
-        path = self.cache_path / self.member_path
+        self._validate()
+        path = self._cached_path
+        if path is None:
+            raise FileNotFoundError(str(self.member_path))
         if path.exists():
             with path.open(mode, encoding=encoding) as stream:
                 yield stream
             return
 
-        # stream from the archivew
+        # read from cache of another archive with the same content
+        state = self._get_state()
+        extracted = state.extracted
+        member = self.member_path.as_posix()
+        shared_path = extracted.get(member)
+        if shared_path is not None and shared_path.is_file():
+            with shared_path.open(mode, encoding=encoding) as stream:
+                yield stream
+            return
+
+        # stream from the archive
         with self.get_descriptor() as descriptor:
-            yield ArchiveStream(
+            stream = ArchiveStream(
                 descriptor=descriptor,
                 cache_path=self.cache_path,
                 member_path=self.member_path,
                 mode=mode,
                 encoding=encoding,
+                index=self._index,
             )
+            try:
+                yield stream
+            finally:
+                stream.close()
+        if path.is_file():
+            extracted[member] = path
+            if self.check_interval is not None and state.identity is not None:
+                add_to_cache(
+                    cache_path=self.cache_path,
+                    archive_path=self.archive_path,
+                    identity=state.identity,
+                    member=member,
+                )
 
     # methods
 
@@ -178,101 +278,222 @@ class ArchivePath:
         return self.copy(archive_path=archive_path)
 
     def copy(self, **kwargs) -> 'ArchivePath':
-        params = attr.asdict(self, recurse=False)
+        params = dict(
+            archive_path=self.archive_path,
+            cache_path=self.cache_path,
+            member_path=self.member_path,
+            source=self.source,
+            io_profile=self.io_profile,
+            check_interval=self.check_interval,
+            hash_content=self.hash_content,
+            descriptor=self._descriptor,
+            state=self._state,
+        )
         params.update(kwargs)
-        if '_descriptor' in params:
-            del params['_descriptor']
-        new = type(self)(**params)
-        new._descriptor = self._descriptor
-        return new
-
-    def _get_file_name(self, member) -> Optional[str]:
-        name = getattr(member, 'name', None) or member.filename
-        if self._is_root:
-            return name
-        prefix = self.member_path.as_posix() + '/'
-        if not name.startswith(prefix):
-            return None
-        name = name[len(prefix):]
-        return name or None
-
-    def iterdir(self, _recursive: bool = True) -> Iterator['ArchivePath']:
-        with self.get_descriptor() as descriptor:
-            if hasattr(descriptor, 'getmembers'):
-                members = descriptor.getmembers()   # tar
-            else:
-                members = descriptor.infolist()     # zip
-
-            top_level_items = set()  # type: Set[str]
-            # get files
-            for member in members:
-                name = self._get_file_name(member=member)
-                if name is None:
-                    continue
+        return type(self)(**params)
 
-                if not _recursive:
-                    path, _sep, _name = name.partition('/')
-                    if path in top_level_items:
-                        continue
+    def _get_identity(self) -> str:
+        return get_identity(
+            path=self.archive_path,
+            is_zip=self.extractor is _zip_open,
+            full=self.hash_content and self.extractor is not _zip_open,
+        )
 
-                    top_level_items.add(path)
-                    yield self.copy(member_path=PurePath(path))
-                    continue
+    def _get_state(self) -> ArchiveState:
+        self._validate()
+        if self._state is None:
+            self._state = self._resolve_state()
+        return self._state
+
+    def _resolve_state(self) -> ArchiveState:
+        stamp = get_stamp(self.archive_path)
+        state = get_state(self._get_identity())
+        state.stamps[str(self.archive_path)] = stamp
+        state.checked[str(self.archive_path)] = monotonic()
+        if self.check_interval is not None and state.identity is not None:
+            # the cache can be filled from another version of the archive,
+            # by another path or process
+            check_cache(cache_path=self.cache_path, archive_path=self.archive_path, identity=state.identity)
+        return state
+
+    def _validate(self) -> None:
+        """Drop the state if the archive file has been changed.
+
+        The file is checked not more often than `check_interval`.
+        """
+        if self.source is not None or self.check_interval is None:
+            return
+        state = self._state
+        if state is None:
+            # the first use, check the cache before reading from it
+            self._state = self._resolve_state()
+            return
+        if state.stale:
+            # invalidated from another path
+            self._descriptor = None
+            self._state = self._resolve_state()
+            return
 
-                yield self.copy(member_path=PurePath(name))
+        key = str(self.archive_path)
+        now = monotonic()
+        if key in state.checked and now - state.checked[key] < self.check_interval:
+            return
+        state.checked[key] = now
+        stamp = get_stamp(self.archive_path)
+        if key in state.stamps and stamp == state.stamps[key]:
+            return
 
-            if not _recursive:
-                return
+        # mtime can be changed without changing the content (`touch`)
+        if stamp is not None and self._get_identity() == state.identity:
+            state.stamps[key] = stamp
+            return
 
-            # get dirs
-            names = set()
-            for member in members:
-                name = self._get_file_name(member=member)
-                if name is None:
-                    continue
+        for member in state.extracted:
+            remove_member(cache_path=self.cache_path, member=member)
+        state.invalidate()
+        self._descriptor = None
+        self._state = self._resolve_state()
+
+    def _lookup(self, check: Callable[..., bool]) -> bool:
+        index = self._index
+        path = self.member_path.as_posix()
+        if index.complete:
+            return check(index, descriptor=None, path=path)
+        with self.get_descriptor() as descriptor:
+            return check(index, descriptor=descriptor, path=path)
+
+    def _get_table(self) -> MemberTable:
+        state = self._get_state()
+        if state.table is None:
+            state.table = self._build_table()
+        return state.table
+
+    def _build_table(self) -> MemberTable:
+        table = MemberTable()
+        with self._open_source() as stream:
+            if self.extractor is _zip_open:
+                for entry in iter_central_directory(stream):
+                    table.add(
+                        name=entry.name,
+                        offset=entry.header_offset,
+                        size=entry.file_size,
+                        is_dir=entry.name.endswith('/'),
+                    )
+                return table
+
+            with self.extractor(str(self.archive_path), fileobj=stream) as descriptor:
+                while True:
+                    member = descriptor.next()
+                    if member is None:
+                        break
+                    # don't keep TarInfo objects, the table is enough
+                    descriptor.members = []
+                    table.add(name=member.name, offset=member.offset, size=member.size, is_dir=member.isdir())
+        return table
+
+    @traced_iterator('iterdir')
+    def iterdir(self, _recursive: bool = True) -> Iterator['ArchivePath']:
+        table = self._get_table()
+        prefix = '' if self._is_root else self.member_path.as_posix()
 
-                name = name.rstrip('/')
-                names.add(name)
-            dirs = {''}
-            for name in names:
-                path, _sep, _name = name.rpartition('/')
-                if path in dirs or path in names:
+        if not _recursive:
+            top_level_items = set()  # type: Set[str]
+            for name, _is_dir in table.iter_members(prefix=prefix):
+                path, _sep, _name = name.partition('/')
+                if path in top_level_items:
                     continue
-                dirs.add(path)
+                top_level_items.add(path)
                 yield self.copy(member_path=PurePath(path))
+            return
+
+        # get files and dirs that have own entry
+        for name, _is_dir in table.iter_members(prefix=prefix):
+            yield self.copy(member_path=PurePath(name))
+        # get implicit dirs
+        for name in table.iter_implicit_dirs(prefix=prefix):
+            yield self.copy(member_path=PurePath(name))
 
+    @traced_iterator('glob')
     def glob(self, pattern: str) -> Iterator['ArchivePath']:
         for path in self.iterdir(_recursive=True):
             if glob_path(path=path.member_path.as_posix(), pattern=pattern):
                 yield path
 
+    @traced('exists')
     def exists(self) -> bool:
         if self._is_root:
             return True
-        path = self.cache_path / self.member_path
-        if path.exists():
+        self._validate()
+        path = self._cached_path
+        if path is not None and path.exists():
             return True
-        with self.open() as stream:
-            return stream.exists()
+        return self._lookup(MemberIndex.exists)
 
+    @traced('is_file')
     def is_file(self) -> bool:
         if self._is_root:
             return False
-        path = self.cache_path / self.member_path
-        if path.exists():
+        self._validate()
+        path = self._cached_path
+        if path is not None and path.exists():
             return path.is_file()
-        with self.open() as stream:
-            return stream.is_file()
+        return self._lookup(MemberIndex.is_file)
 
+    @traced('is_dir')
     def is_dir(self) -> bool:
         if self._is_root:
             return True
-        path = self.cache_path / self.member_path
-        if path.exists():
+        self._validate()
+        path = self._cached_path
+        if path is not None and path.exists():
             return path.is_dir()
-        with self.open() as stream:
-            return stream.is_dir()
+        return self._lookup(MemberIndex.is_dir)
+
+    def _find_metadata(self, descriptor):
+        index = self._index
+        if self.archive_path.suffix != '.whl':
+            return index.find(descriptor=descriptor, match=_is_sdist_metadata)
+
+        # {distribution}-{version}(-{build tag})?-{python tag}-{abi tag}-{platform tag}.whl
+        parts = self.archive_path.name.split('-')
+        if len(parts) >= 5:
+            entry = index.get(descriptor=descriptor, path='{}-{}.dist-info/METADATA'.format(*parts))
+            if entry is not None:
+                return entry
+        return index.find(descriptor=descriptor, match=_is_wheel_metadata)
+
+    @traced('read_metadata')
+    def read_metadata(self) -> Optional[str]:
+        """
+        Read METADATA of the wheel or PKG-INFO of the sdist.
 
+        The file is read without extraction into the cache, tar archives are
+        scanned only up to the file. The result is cached for the archive content.
+        Returns None if there is no metadata file in the archive.
+        """
+        state = self._get_state()
+        if state.metadata_loaded:
+            return state.metadata
+
+        content = None
+        with self.get_descriptor() as descriptor:
+            entry = self._find_metadata(descriptor=descriptor)
+            if entry is not None:
+                if hasattr(descriptor, 'extractfile'):
+                    content = descriptor.extractfile(entry).read()  # tar
+                else:
+                    content = descriptor.read(entry)                # zip
+
+        if content is not None:
+            try:
+                state.metadata = content.decode('utf-8')
+            except UnicodeDecodeError:
+                # PKG-INFO of old sdists can be in latin-1
+                state.metadata = content.decode('latin-1')
+        state.metadata_loaded = True
+        return state.metadata
+
+    @traced('read_bytes')
     def read_bytes(self):
         """
         Open the file in bytes mode, read it, and close the file.
@@ -280,6 +501,17 @@ class ArchivePath:
         with self.open(mode='rb') as stream:
             return stream.read()
 
+    @traced('read_range')
+    def read_range(self, offset: int, length: int) -> bytes:
+        """
+        Read `length` bytes of the file starting from `offset`
+        without extracting the whole file.
+        """
+        with self.open(mode='rb') as stream:
+            stream.seek(offset)
+            return stream.read(length)
+
+    @traced('read_text')
     def read_text(self):
         """
         Open the file in text mode, read it, and close the file.
@@ -296,16 +528,67 @@ class ArchivePath:
     # magic methods
 
     def __truediv__(self, part: str) -> 'ArchivePath':
-        obj = type(self)(
-            archive_path=self.archive_path,
-            cache_path=self.cache_path,
-            member_path=self.member_path / part,
-        )
-        obj._descriptor = self._descriptor
-        return obj
+        return self.copy(member_path=self.member_path / part)
 
     def __getattr__(self, name: str):
         return getattr(self.member_path, name)
 
+    def __repr__(self) -> str:
+        return '{}(archive_path={!r}, cache_path={!r}, member_path={!r})'.format(
+            type(self).__name__, self.archive_path, self.cache_path, self.member_path,
+        )
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._as_tuple() == other._as_tuple()
+
+    def __lt__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._as_tuple() < other._as_tuple()
+
+    def __le__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._as_tuple() <= other._as_tuple()
+
+    def __gt__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._as_tuple() > other._as_tuple()
+
+    def __ge__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._as_tuple() >= other._as_tuple()
+
+    __hash__ = None  # type: ignore
+
+    def _as_tuple(self) -> tuple:
+        # all constructor arguments in the same order, except the derived state
+        return (
+            self.archive_path,
+            self.cache_path,
+            self.member_path,
+            self._descriptor,
+            self.source,
+            self.io_profile,
+            self.check_interval,
+            self.hash_content,
+        )
+
+    def __getstate__(self) -> dict:
+        # open descriptor can't be pickled, it will be reopened on demand
+        state = self.__dict__.copy()
+        state['_descriptor'] = None
+        # local archives are found in the shared states again by content
+        if self.source is None:
+            state['_state'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
     def __str__(self) -> str:
         return str(self.member_path)
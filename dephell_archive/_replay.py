@@ -0,0 +1,237 @@
+# built-in
+import json
+from argparse import ArgumentParser
+from collections import Counter, OrderedDict
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# app
+from ._path import ArchivePath
+
+
+# operations that read member content and go through the extraction cache
+READ_OPERATIONS = frozenset({'open', 'read_bytes', 'read_text', 'read_range', 'read_metadata'})
+POLICIES = ('lru', 'lfu', 'fifo')
+_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+class Event(NamedTuple):
+    ts: float
+    archive: str
+    member: str
+    op: str
+    latency: float
+    # `bytes` in the trace file
+    size: int
+
+
+class SimulationResult(NamedTuple):
+    policy: str
+    capacity: int
+    hits: int
+    misses: int
+    hit_bytes: int
+    miss_bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def byte_hit_ratio(self) -> float:
+        total = self.hit_bytes + self.miss_bytes
+        return self.hit_bytes / total if total else 0.0
+
+
+def load_trace(path: Path) -> List[Event]:
+    events = []
+    with path.open(encoding='utf-8') as stream:
+        for line in stream:
+            line = line.strip()
+            if line:
+                data = json.loads(line)
+                data['size'] = data.pop('bytes')
+                events.append(Event(**data))
+    return events
+
+
+def _get_reads(events: Iterable[Event]) -> Tuple[List[Tuple[str, str]], Dict[Tuple[str, str], int]]:
+    """Keys of read members in order of access and the biggest known size of every one.
+
+    `open` doesn't know how much will be read, so sizes come from other reads.
+    Members that are only opened are left out, otherwise they would be free in the cache.
+    """
+    keys = []
+    sizes = dict()  # type: Dict[Tuple[str, str], int]
+    for event in events:
+        if event.op not in READ_OPERATIONS:
+            continue
+        # read_metadata is called on the archive root
+        key = (event.archive, event.member or '<metadata>')
+        keys.append(key)
+        if event.op != 'open':
+            sizes[key] = max(sizes.get(key, 0), event.size)
+    return [key for key in keys if key in sizes], sizes
+
+
+def simulate(events: Iterable[Event], capacity: int, policy: str = 'lru') -> SimulationResult:
+    """Replay member reads against a cache of extracted members limited to `capacity` bytes.
+    """
+    if policy not in POLICIES:
+        raise ValueError('unknown policy: ' + policy)
+    keys, sizes = _get_reads(events)
+
+    cache = OrderedDict()  # type: OrderedDict
+    frequency = Counter()  # type: Counter
+    used = 0
+    hits = misses = hit_bytes = miss_bytes = 0
+    for key in keys:
+        size = sizes[key]
+        frequency[key] += 1
+        if key in cache:
+            hits += 1
+            hit_bytes += size
+            if policy == 'lru':
+                cache.move_to_end(key)
+            continue
+
+        misses += 1
+        miss_bytes += size
+        if size > capacity:
+            continue
+        while used + size > capacity:
+            if policy == 'lfu':
+                victim = min(cache, key=frequency.__getitem__)
+            else:
+                victim = next(iter(cache))
+            used -= cache.pop(victim)
+        cache[key] = size
+        used += size
+
+    return SimulationResult(
+        policy=policy,
+        capacity=capacity,
+        hits=hits,
+        misses=misses,
+        hit_bytes=hit_bytes,
+        miss_bytes=miss_bytes,
+    )
+
+
+def suggest_prefetch(events: Iterable[Event], limit: int = 20) -> List[Tuple[str, str, int, int]]:
+    """The most often read members: (archive, member, reads, size).
+
+    Members read more than once are worth prefetching or pinning in the cache.
+    """
+    keys, sizes = _get_reads(events)
+    counts = Counter(keys)
+    result = []  # type: List[Tuple[str, str, int, int]]
+    for (archive, member), count in counts.most_common():
+        if count < 2 or len(result) >= limit:
+            break
+        result.append((archive, member, count, sizes[(archive, member)]))
+    return result
+
+
+def replay(events: Iterable[Event], cache_path: Path, io_profile: Optional[str] = None) -> Tuple[float, int]:
+    """Execute the trace through ArchivePath. Returns the total time and number of errors.
+
+    Every archive gets its own cache dir inside of `cache_path`.
+    Offsets of `read_range` aren't traced, so ranges are read from the beginning.
+    """
+    roots = dict()  # type: Dict[str, ArchivePath]
+    errors = 0
+    start = perf_counter()
+    for event in events:
+        root = roots.get(event.archive)
+        if root is None:
+            root = ArchivePath(
+                archive_path=Path(event.archive),
+                cache_path=cache_path / str(len(roots)),
+                io_profile=io_profile,
+            )
+            roots[event.archive] = root
+        path = root.joinpath(event.member) if event.member else root
+        try:
+            _execute(path=path, event=event)
+        except Exception:
+            errors += 1
+    return perf_counter() - start, errors
+
+
+def _execute(path: ArchivePath, event: Event) -> None:
+    if event.op in ('iterdir', 'glob'):
+        # glob patterns aren't traced, it's the same full listing anyway
+        for _ in path.iterdir():
+            pass
+    elif event.op == 'open':
+        with path.open(mode='rb'):
+            pass
+    elif event.op == 'read_range':
+        path.read_range(0, event.size)
+    elif event.op in ('exists', 'is_file', 'is_dir', 'read_bytes', 'read_text', 'read_metadata'):
+        getattr(path, event.op)()
+    # get_descriptor is a part of all other operations
+
+
+def _parse_size(text: str) -> int:
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1] if text and text[-1] in _UNITS else ''
+    return int(float(text[:len(text) - len(unit)]) * _UNITS[unit])
+
+
+def _format_size(size: int) -> str:
+    for unit in ('G', 'M', 'K'):
+        if size >= _UNITS[unit]:
+            return '{:.1f}{}'.format(size / _UNITS[unit], unit)
+    return str(size)
+
+
+def main(argv: List[str]) -> int:
+    parser = ArgumentParser(prog='python3 -m dephell_archive replay', description='Analyze access trace.')
+    parser.add_argument('trace', type=Path, help='trace file recorded by dephell_archive.trace')
+    parser.add_argument('--sizes', nargs='+', default=['16M', '64M', '256M', '1G'], help='cache sizes to compare')
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=POLICIES)
+    parser.add_argument('--prefetch', type=int, default=20, help='how many members to suggest for prefetch')
+    parser.add_argument('--execute', type=Path, metavar='CACHE_PATH', help='replay the trace through ArchivePath')
+    parser.add_argument('--io-profile', help='IOProfile name for --execute')
+    args = parser.parse_args(argv)
+
+    events = load_trace(args.trace)
+    operations = Counter(event.op for event in events)
+    print('events: {}, archives: {}'.format(len(events), len({event.archive for event in events})))
+    for operation, count in operations.most_common():
+        latency = sum(event.latency for event in events if event.op == operation)
+        print('  {:<16} {:>8} {:>10.3f}s'.format(operation, count, latency))
+
+    reads = sum(1 for event in events if event.op in READ_OPERATIONS)
+    unknown = reads - len(_get_reads(events)[0])
+    if unknown:
+        print('opened members of unknown size (not simulated): {}'.format(unknown))
+
+    print('\n{:<6} {:>8} {:>10} {:>10}'.format('policy', 'size', 'hits', 'bytes'))
+    best = None  # type: Optional[SimulationResult]
+    for size in sorted(_parse_size(size) for size in args.sizes):
+        for policy in args.policies:
+            result = simulate(events=events, capacity=size, policy=policy)
+            print('{:<6} {:>8} {:>9.1%} {:>9.1%}'.format(
+                policy, _format_size(size), result.hit_ratio, result.byte_hit_ratio,
+            ))
+            # only strictly better, so the smallest cache wins ties
+            if best is None or result.hit_ratio > best.hit_ratio:
+                best = result
+    if best is not None:
+        print('suggested cache: {} {}'.format(best.policy, _format_size(best.capacity)))
+
+    prefetch = suggest_prefetch(events=events, limit=args.prefetch)
+    if prefetch:
+        print('\nprefetch candidates:')
+        for archive, member, count, size in prefetch:
+            print('  {:>6}x {:>8} {} {}'.format(count, _format_size(size), archive, member))
+
+    if args.execute is not None:
+        elapsed, errors = replay(events=events, cache_path=args.execute, io_profile=args.io_profile)
+        print('\nreplayed in {:.3f}s, errors: {}'.format(elapsed, errors))
+    return 0
@@ -0,0 +1,129 @@
+# built-in
+import os
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+# app
+from ._path import ArchivePath
+
+
+# how many archives every worker keeps open between tasks
+_MAX_OPEN = 8
+
+
+class ScanResult(NamedTuple):
+    archive: ArchivePath
+    result: Any = None
+    error: Optional[BaseException] = None
+    traceback: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _Worker:
+    """Calls the function for archives, reusing open descriptors.
+
+    One instance lives in every pool process. The last few opened archives
+    are kept open, so consecutive tasks for the same archive
+    (and all member reads inside of one task) share a single descriptor.
+    """
+
+    def __init__(self, func: Callable[[ArchivePath], Any]) -> None:
+        self.func = func
+        self.opened = OrderedDict()  # type: OrderedDict
+
+    def _attach(self, archive: ArchivePath) -> None:
+        key = str(archive.archive_path)
+        if key in self.opened:
+            self.opened.move_to_end(key)
+            descriptor, _stack = self.opened[key]
+            archive._descriptor = descriptor
+            return
+
+        stack = ExitStack()
+        descriptor = stack.enter_context(archive.get_descriptor())
+        self.opened[key] = (descriptor, stack)
+        while len(self.opened) > _MAX_OPEN:
+            _key, (_descriptor, old_stack) = self.opened.popitem(last=False)
+            old_stack.close()
+
+    def _forget(self, archive: ArchivePath) -> None:
+        _descriptor, stack = self.opened.pop(str(archive.archive_path), (None, None))
+        if stack is not None:
+            stack.close()
+
+    def __call__(self, archive: ArchivePath) -> ScanResult:
+        try:
+            self._attach(archive)
+            result = self.func(archive)
+        except Exception as exc:
+            from traceback import format_exc
+            self._forget(archive)
+            return ScanResult(archive=archive, error=exc, traceback=format_exc())
+        return ScanResult(archive=archive, result=result)
+
+    def close(self) -> None:
+        while self.opened:
+            _key, (_descriptor, stack) = self.opened.popitem()
+            stack.close()
+
+
+_worker = None  # type: Optional[_Worker]
+
+
+def _init_worker(func: Callable[[ArchivePath], Any]) -> None:
+    global _worker
+    _worker = _Worker(func=func)
+
+
+def _run_worker(archive: ArchivePath) -> ScanResult:
+    assert _worker is not None
+    result = _worker(archive)
+    if result.error is None:
+        return result
+
+    # the result is sent to the main process, and an exception that can't be
+    # restored there (like one with custom required args) would hang the pool
+    from pickle import dumps, loads
+    try:
+        loads(dumps(result.error))
+    except Exception:
+        error = RuntimeError(repr(result.error))
+        return result._replace(error=error)
+    return result
+
+
+def scan(archives: Iterable[ArchivePath], func: Callable[[ArchivePath], Any], *,
+         workers: Optional[int] = None, chunksize: int = 1, ordered: bool = True) -> Iterator[ScanResult]:
+    """Call `func` for every archive in a pool of processes.
+
+    `func` must be picklable (a module-level function).
+    Yields `ScanResult` for every archive. An exception raised by `func`
+    doesn't stop the scan, it's stored in the `error` attribute of the result.
+    If `ordered` is False, results are yielded as soon as they are ready.
+    If `workers` is 1, everything is done in the current process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        worker = _Worker(func=func)
+        try:
+            for archive in archives:
+                yield worker(archive)
+        finally:
+            worker.close()
+        return
+
+    # import it only when needed, it is heavy
+    from multiprocessing import Pool
+
+    with Pool(processes=workers, initializer=_init_worker, initargs=(func, )) as pool:
+        if ordered:
+            results = pool.imap(_run_worker, archives, chunksize)
+        else:
+            results = pool.imap_unordered(_run_worker, archives, chunksize)
+        yield from results
@@ -0,0 +1,266 @@
+# built-in
+import io
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+
+KB = 1024
+MB = 1024 * KB
+
+
+class IOProfile(NamedTuple):
+    """How to read an archive.
+
+    + buffer_size -- buffer size for the file object.
+    + read_ahead -- how many bytes from the beginning of the file to prefetch.
+      For local files, it is a hint for the OS, for HTTP it is how many bytes
+      after the requested range to fetch in the same request.
+    + advice -- access pattern hint for `posix_fadvise`:
+      "sequential", "random", "normal", or None to say nothing.
+    + memory_threshold -- read the whole archive into memory
+      if it is not bigger than this size.
+    """
+    buffer_size: int = io.DEFAULT_BUFFER_SIZE
+    read_ahead: int = 0
+    advice: Optional[str] = None
+    memory_threshold: int = 0
+
+
+PROFILES = {
+    # what python does by default
+    'default': IOProfile(),
+    # tar archives: the whole stream goes through the decompressor
+    'sequential': IOProfile(buffer_size=1 * MB, read_ahead=8 * MB, advice='sequential'),
+    # zip archives: central directory at the end, members in random places
+    'random': IOProfile(buffer_size=64 * KB, advice='random'),
+    # small archives on high latency storage: one big read instead of many small
+    'memory': IOProfile(buffer_size=1 * MB, memory_threshold=32 * MB, advice='sequential'),
+}
+
+
+def get_profile(profile: Union[IOProfile, str, None]) -> Optional[IOProfile]:
+    if isinstance(profile, str):
+        return PROFILES[profile]
+    return profile
+
+
+def _advise(stream, profile: IOProfile) -> None:
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = stream.fileno()
+    if profile.advice is not None:
+        advice = getattr(os, 'POSIX_FADV_' + profile.advice.upper())
+        os.posix_fadvise(fd, 0, 0, advice)
+    if profile.read_ahead:
+        os.posix_fadvise(fd, 0, profile.read_ahead, os.POSIX_FADV_WILLNEED)
+
+
+class FileSource:
+    """Archive stored in the local file system.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def __repr__(self) -> str:
+        return '{}(path={!r})'.format(type(self).__name__, self.path)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.path == other.path
+
+    __hash__ = None  # type: ignore
+
+    def open(self, profile: Optional[IOProfile] = None) -> IO[bytes]:
+        if profile is None:
+            return open(str(self.path), mode='rb')
+
+        stream = open(str(self.path), mode='rb', buffering=profile.buffer_size)
+        try:
+            if profile.memory_threshold:
+                if os.fstat(stream.fileno()).st_size <= profile.memory_threshold:
+                    with stream:
+                        return io.BytesIO(stream.read())
+            _advise(stream=stream, profile=profile)
+        except Exception:
+            stream.close()
+            raise
+        return stream
+
+
+class BufferSource:
+    """Archive already loaded into memory.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def __repr__(self) -> str:
+        return '{}(<{} bytes>)'.format(type(self).__name__, len(self.data))
+
+    def open(self, profile: Optional[IOProfile] = None) -> IO[bytes]:
+        return io.BytesIO(self.data)
+
+
+class HTTPSource:
+    """Archive on a remote server that supports HTTP range requests.
+
+    The file is read by blocks of `block_size` bytes, and all blocks
+    that are missed for one read are fetched by a single request.
+    Fetched blocks are kept in a cache (up to `max_blocks`),
+    shared between all streams opened from the source.
+    If the server ignores the range and sends the whole file,
+    the file is kept in memory and never requested again.
+    """
+
+    def __init__(self, url: str, block_size: int = 64 * KB, max_blocks: int = 256,
+                 headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> None:
+        self.url = url
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.headers = headers or dict()
+        self.timeout = timeout
+
+        self._size = None  # type: Optional[int]
+        self._blocks = OrderedDict()  # type: OrderedDict
+        # the whole file, if the server doesn't support ranges
+        self._content = None  # type: Optional[bytes]
+
+    def __repr__(self) -> str:
+        return '{}(url={!r}, block_size={!r})'.format(type(self).__name__, self.url, self.block_size)
+
+    def __getstate__(self) -> dict:
+        # fetched data isn't sent to scan() workers, they fetch what they need
+        state = self.__dict__.copy()
+        state['_size'] = None
+        state['_blocks'] = OrderedDict()
+        state['_content'] = None
+        return state
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            with self._request(method='HEAD') as response:
+                length = response.headers.get('Content-Length')
+            if length is None:
+                raise ValueError('server did not report the archive size (Content-Length): ' + self.url)
+            self._size = int(length)
+        return self._size
+
+    def open(self, profile: Optional[IOProfile] = None) -> IO[bytes]:
+        if profile is None:
+            return _RangeStream(source=self)  # type: ignore
+        if profile.memory_threshold and self.size <= profile.memory_threshold:
+            return io.BytesIO(self.read_at(offset=0, length=self.size))
+        return _RangeStream(source=self, read_ahead=profile.read_ahead)  # type: ignore
+
+    def _request(self, method: str = 'GET', headers: Optional[Dict[str, str]] = None):
+        # import it only when needed, it is heavy
+        from urllib.request import Request, urlopen
+
+        all_headers = dict(self.headers)
+        all_headers.update(headers or {})
+        request = Request(url=self.url, headers=all_headers, method=method)
+        return urlopen(request, timeout=self.timeout)
+
+    def _fetch(self, first: int, last: int) -> None:
+        """Fetch blocks from `first` to `last` (inclusive) by one request.
+        """
+        start = first * self.block_size
+        end = min((last + 1) * self.block_size, self.size) - 1
+        headers = {'Range': 'bytes={}-{}'.format(start, end)}
+        with self._request(headers=headers) as response:
+            content = response.read()
+            if response.status != 206:
+                # the server doesn't support ranges and sent the whole file,
+                # keep it instead of downloading it again for every missed block
+                self._content = content
+                self._blocks.clear()
+                return
+        for number in range(first, last + 1):
+            offset = number * self.block_size - start
+            self._blocks[number] = content[offset:offset + self.block_size]
+            self._blocks.move_to_end(number)
+
+    def read_at(self, offset: int, length: int, read_ahead: int = 0) -> bytes:
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b''
+        if self._content is not None:
+            return self._content[offset:end]
+        first = offset // self.block_size
+        last = (end - 1) // self.block_size
+        last_ahead = (min(end + read_ahead, self.size) - 1) // self.block_size
+
+        # coalesce missed blocks into continuous ranges
+        ranges = []  # type: List[Tuple[int, int]]
+        for number in range(first, last_ahead + 1):
+            if number in self._blocks:
+                self._blocks.move_to_end(number)
+                continue
+            if ranges and ranges[-1][1] == number - 1:
+                ranges[-1] = (ranges[-1][0], number)
+            else:
+                ranges.append((number, number))
+        for range_first, range_last in ranges:
+            if self._content is not None:
+                break
+            self._fetch(first=range_first, last=range_last)
+        if self._content is not None:
+            return self._content[offset:end]
+
+        chunks = [self._blocks[number] for number in range(first, last + 1)]
+        while len(self._blocks) > max(self.max_blocks, last_ahead - first + 1):
+            self._blocks.popitem(last=False)
+        skip = offset - first * self.block_size
+        return b''.join(chunks)[skip:skip + end - offset]
+
+
+class _RangeStream(io.RawIOBase):
+    """Seekable read-only stream over HTTPSource.
+    """
+
+    def __init__(self, source: HTTPSource, read_ahead: int = 0) -> None:
+        self.source = source
+        self.read_ahead = read_ahead
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.source.size + offset
+        else:
+            raise ValueError('invalid whence: {}'.format(whence))
+        if position < 0:
+            raise ValueError('negative seek position: {}'.format(position))
+        self.position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        content = self.source.read_at(
+            offset=self.position,
+            length=len(buffer),
+            read_ahead=self.read_ahead,
+        )
+        size = len(content)
+        buffer[:size] = content
+        self.position += size
+        return size
+
+    def readall(self) -> bytes:
+        return self.read(max(self.source.size - self.position, 0))
@@ -0,0 +1,219 @@
+# built-in
+import os
+from collections import OrderedDict
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, Optional
+
+# app
+from ._index import MemberIndex
+from ._listing import MemberTable
+from ._zip import find_central_directory
+
+
+_CHUNK_SIZE = 1024 * 1024
+
+# (st_dev, st_ino, st_size, st_mtime_ns) -> identity
+_identities = OrderedDict()  # type: OrderedDict
+_MAX_IDENTITIES = 4096
+
+# identity -> ArchiveState for recently used archives
+_states = OrderedDict()  # type: OrderedDict
+_MAX_STATES = 256
+
+# dir inside of the cache dir for manifests of archives extracted into it.
+# A manifest is a list of extracted members, the first line is the archive identity.
+# The dir is hidden from ArchivePath, it's not a member of any archive.
+MANIFESTS_DIR = '.dephell-archive'
+
+
+class ArchiveState:
+    """Everything that is known about the archive content.
+
+    Archives with the same content (the same wheel in pip cache, mirror,
+    and build dir) share one state, so members are listed and extracted only once.
+    """
+
+    def __init__(self, identity: Optional[str] = None) -> None:
+        self.identity = identity
+        self.index = MemberIndex()
+        # member path -> path to the already extracted file
+        self.extracted = dict()  # type: Dict[str, Path]
+        # compact listing of all members, built on the first iterdir
+        self.table = None  # type: Optional[MemberTable]
+        # content of METADATA or PKG-INFO, if it was read
+        self.metadata = None  # type: Optional[str]
+        self.metadata_loaded = False
+
+        # archive path -> stamp of the file when it was checked last time
+        self.stamps = dict()  # type: Dict[str, Optional[tuple]]
+        # archive path -> monotonic time of the last check
+        self.checked = dict()  # type: Dict[str, float]
+        # the state was invalidated and must not be used anymore
+        self.stale = False
+
+    def invalidate(self) -> None:
+        """Forget everything about the archive and remove extracted files.
+        """
+        self.stale = True
+        for path in self.extracted.values():
+            with suppress(FileNotFoundError):
+                path.unlink()
+        self.extracted = dict()
+        self.index = MemberIndex()
+        self.table = None
+        self.metadata = None
+        self.metadata_loaded = False
+        if self.identity is not None and _states.get(self.identity) is self:
+            del _states[self.identity]
+
+
+def _hasher():
+    # import it only when needed, it is heavy
+    from hashlib import blake2b
+    return blake2b(digest_size=20)
+
+
+def _full_digest(stream) -> str:
+    hasher = _hasher()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b''):
+        hasher.update(chunk)
+    return 'full:' + hasher.hexdigest()
+
+
+def _zip_digest(stream, size: int) -> Optional[str]:
+    """Hash of zip central directory.
+
+    The central directory has names, sizes, and CRC32 of all members,
+    so it identifies the content without reading the whole archive.
+    """
+    found = find_central_directory(stream=stream, size=size)
+    if found is None:
+        return None
+    offset, cd_size, record = found
+    if offset < 0:
+        return None
+    hasher = _hasher()
+    hasher.update(record)
+    stream.seek(offset)
+    while cd_size > 0:
+        chunk = stream.read(min(cd_size, _CHUNK_SIZE))
+        if not chunk:
+            return None
+        hasher.update(chunk)
+        cd_size -= len(chunk)
+    return 'zip:{}:{}'.format(size, hasher.hexdigest())
+
+
+def get_stamp(path: Path) -> Optional[tuple]:
+    """Cheap fingerprint of the file version, None if there is no file.
+    """
+    try:
+        stat = os.stat(str(path))
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def get_identity(path: Path, is_zip: bool = False, full: bool = False) -> str:
+    """Get identity of the archive content.
+
+    For zip archives it is a hash of the central directory. Other archives
+    are identified by the file stat (device, inode, size, and mtime),
+    so copies don't share the state. If `full` is True, the digest
+    of the whole file is calculated instead, it's slow for big archives.
+    Digests are memoized by the stat, so they are calculated once per file version.
+    """
+    stat = os.stat(str(path))
+    stamp = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    if not is_zip and not full:
+        return 'stat:{}:{}:{}:{}'.format(*stamp)
+
+    key = stamp + (full, )
+    identity = _identities.get(key)
+    if identity is not None:
+        _identities.move_to_end(key)
+        return identity
+
+    with open(str(path), mode='rb') as stream:
+        if full:
+            identity = _full_digest(stream=stream)
+        else:
+            identity = _zip_digest(stream=stream, size=stat.st_size)
+    if identity is None:
+        # broken zip, it's not worth reading it whole
+        identity = 'stat:{}:{}:{}:{}'.format(*stamp)
+
+    _identities[key] = identity
+    while len(_identities) > _MAX_IDENTITIES:
+        _identities.popitem(last=False)
+    return identity
+
+
+def get_state(identity: str) -> ArchiveState:
+    state = _states.get(identity)
+    if state is not None:
+        _states.move_to_end(identity)
+        return state
+
+    state = ArchiveState(identity=identity)
+    _states[identity] = state
+    while len(_states) > _MAX_STATES:
+        _states.popitem(last=False)
+    return state
+
+
+def _get_manifest(cache_path: Path, archive_path: Path) -> Path:
+    # import it only when needed, the manifests are used only with `check_interval`
+    from hashlib import blake2b
+
+    name = blake2b(os.path.abspath(str(archive_path)).encode('utf-8'), digest_size=16).hexdigest()
+    return cache_path / MANIFESTS_DIR / name
+
+
+def add_to_cache(cache_path: Path, archive_path: Path, identity: str, member: str) -> None:
+    """Register the member extracted from the archive into the cache dir.
+    """
+    path = _get_manifest(cache_path=cache_path, archive_path=archive_path)
+    path.parent.mkdir(exist_ok=True)
+    with path.open('a', encoding='utf-8') as stream:
+        if not stream.tell():
+            stream.write(identity + '\n')
+        stream.write(member + '\n')
+
+
+def check_cache(cache_path: Path, archive_path: Path, identity: str) -> bool:
+    """Remove files extracted from another version of the archive from the cache dir.
+
+    Every archive path has its own manifest, so archives sharing
+    the cache dir don't remove files of each other.
+    Returns True if something was removed.
+    """
+    path = _get_manifest(cache_path=cache_path, archive_path=archive_path)
+    try:
+        lines = path.read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        return False
+    if not lines or lines[0] == identity:
+        return False
+    for member in lines[1:]:
+        remove_member(cache_path=cache_path, member=member)
+    with suppress(FileNotFoundError):
+        path.unlink()
+    return True
+
+
+def remove_member(cache_path: Path, member: str) -> None:
+    """Remove the extracted file and its parent dirs if they are empty now.
+    """
+    path = cache_path / member
+    with suppress(FileNotFoundError):
+        path.unlink()
+    for parent in path.parents:
+        if parent == cache_path or cache_path not in parent.parents:
+            return
+        try:
+            parent.rmdir()
+        except OSError:
+            return
@@ -1,97 +1,72 @@
 # built-in
-from contextlib import suppress
+import io
 from pathlib import Path, PurePath
-from typing import List, Optional, Set
-
-# external
-import attr
+from typing import Optional
 
 # app
 from ._cached_property import cached_property
+from ._index import MemberIndex
+from ._zip import open_member
 
 
-def _dir_list(filelist: List[str]) -> Set[str]:
-    # paths starting with '/' or containing '.' are not supported
-    dir_list = set()  # type: Set[str]
-    for path in filelist:
-        while path:
-            path, _, _ = path.rpartition('/')
-            if not path or path in dir_list:
-                break
-            dir_list.add(path)
-    return dir_list
-
-
-@attr.s()
 class ArchiveStream:
-    descriptor = attr.ib()
-    cache_path = attr.ib(type=Path)
-    member_path = attr.ib(type=PurePath)
-
-    mode = attr.ib(type=str, default='r')
-    encoding = attr.ib(type=Optional[str], default=None)
+    def __init__(self, descriptor, cache_path: Path, member_path: PurePath,
+                 mode: str = 'r', encoding: Optional[str] = None, index: Optional[MemberIndex] = None) -> None:
+        self.descriptor = descriptor
+        self.cache_path = cache_path
+        self.member_path = member_path
+
+        self.mode = mode
+        self.encoding = encoding
+        # lookup table shared between all streams of the archive
+        self.index = MemberIndex() if index is None else index
+
+    def __repr__(self) -> str:
+        return '{}(descriptor={!r}, cache_path={!r}, member_path={!r}, mode={!r}, encoding={!r})'.format(
+            type(self).__name__, self.descriptor, self.cache_path, self.member_path, self.mode, self.encoding,
+        )
 
     # private
 
-    @cached_property
-    def _is_tar(self) -> bool:
-        return hasattr(self.descriptor, 'getmember')
-
-    @cached_property
-    def _dir_list(self) -> Set[str]:
-        return _dir_list(self.descriptor.namelist())
-
     @cached_property
     def _info(self):
-        path = self.member_path.as_posix()
-        with suppress(KeyError):
-            if self._is_tar:
-                try:
-                    return self.descriptor.getmember(path)
-                except KeyError:
-                    # Handle archives with a single top-level '.' member
-                    return self.descriptor.getmember('./' + str(path))
-            try:
-                return self.descriptor.getinfo(path)  # zip file
-            except KeyError:
-                return self.descriptor.getinfo(path + '/')  # zip dir
-        return None
-
-    @cached_property
-    def _is_implicit_dir(self) -> bool:
-        # Only zip have implicit dirs
-        if self._is_tar:
-            return False
-        path = self.member_path.as_posix()
-        return path in self._dir_list
+        return self.index.get(descriptor=self.descriptor, path=self.member_path.as_posix())
 
-    # used from ArchivePath
+    # checks
 
     def exists(self) -> bool:
-        return self.is_file() or self.is_dir()
+        return self.index.exists(descriptor=self.descriptor, path=self.member_path.as_posix())
 
     def is_file(self) -> bool:
-        if self._info is None:
-            return False
-        if self._is_tar:
-            return self._info.isfile()
-        # zip
-        return self._info.filename[-1] != '/'
+        return self.index.is_file(descriptor=self.descriptor, path=self.member_path.as_posix())
 
     def is_dir(self) -> bool:
-        if self._info is None:
-            return self._is_implicit_dir
-        if self._is_tar:
-            return self._info.isdir()
-        # zip explicit dir entry
-        return self._info.filename[-1] == '/'
+        return self.index.is_dir(descriptor=self.descriptor, path=self.member_path.as_posix())
+
+    @cached_property
+    def _stream(self):
+        """Stream for partial reads, without extraction into the cache.
+        """
+        if not self.is_file():
+            raise FileNotFoundError(self.member_path.as_posix())
+        if hasattr(self.descriptor, 'extractfile'):
+            stream = self.descriptor.extractfile(self._info)    # tar
+        else:
+            stream = open_member(self.descriptor, self._info)   # zip
+        if 'b' not in self.mode:
+            stream = io.TextIOWrapper(stream, encoding=self.encoding)
+        return stream
 
     # public interface
 
-    def read(self):
+    def read(self, size: int = -1):
         if not self.member_path.name:
             raise NotImplementedError
 
+        # partial read or continuation after partial read or seek
+        if size >= 0 or '_stream' in self.__dict__:
+            return self._stream.read(size)
+
         path = self.cache_path / self.member_path
         if path.exists():
             raise FileExistsError('file in cache created between open and read')
@@ -102,3 +77,22 @@ class ArchiveStream:
         # read from cache
         with path.open(self.mode, encoding=self.encoding) as stream:
             return stream.read()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        if '_stream' not in self.__dict__:
+            return 0
+        return self._stream.tell()
+
+    def close(self) -> None:
+        stream = self.__dict__.pop('_stream', None)
+        if stream is not None:
+            stream.close()
@@ -0,0 +1,77 @@
+# built-in
+import stat
+from pathlib import PurePath
+from typing import IO, Iterator, NamedTuple, Optional, Tuple
+
+# app
+from ._glob import glob_path
+from ._index import normalize
+
+
+COMPRESSIONS = ('*', '', 'gz', 'bz2', 'xz')
+
+
+class MemberStat(NamedTuple):
+    """The same fields as `os.stat_result` has, for a tar member.
+    """
+    st_mode: int
+    st_size: int
+    st_mtime: float
+    st_uid: int
+    st_gid: int
+
+
+def _get_stat(member) -> MemberStat:
+    if member.isdir():
+        kind = stat.S_IFDIR
+    elif member.issym():
+        kind = stat.S_IFLNK
+    elif member.isfile() or member.islnk():
+        kind = stat.S_IFREG
+    else:
+        kind = 0
+    return MemberStat(
+        st_mode=kind | member.mode,
+        st_size=member.size,
+        st_mtime=member.mtime,
+        st_uid=member.uid,
+        st_gid=member.gid,
+    )
+
+
+def iter_tar_stream(fileobj: IO[bytes], pattern: Optional[str] = None,
+                    compression: str = '*') -> Iterator[Tuple[PurePath, MemberStat, Optional[IO[bytes]]]]:
+    """Read tar archive from a non-seekable stream (pipe, socket, stdin) in one pass.
+
+    Yields `(member_path, stat, stream)` in the archive order.
+    `stream` is None for everything except regular files, and it can be read
+    only until the next member is requested. If `pattern` is given,
+    only members matching the glob pattern are yielded.
+    `compression` is "gz", "bz2", "xz", "" for no compression,
+    or "*" (default) to detect it.
+
+    Nothing is written on the disk and members are not kept in memory.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError('unsupported compression: ' + compression)
+    # import it only when needed, it is heavy
+    from tarfile import open as tar_open
+
+    with tar_open(fileobj=fileobj, mode='r|' + compression) as descriptor:  # type: ignore
+        while True:
+            member = descriptor.next()
+            if member is None:
+                return
+            # in the stream mode, the list only grows and is never used
+            descriptor.members = []
+
+            name = normalize(member.name)
+            if not name:
+                continue
+            if pattern is not None and not glob_path(path=name, pattern=pattern):
+                continue
+
+            stream = None
+            if member.isfile():
+                stream = descriptor.extractfile(member)
+            yield PurePath(name), _get_stat(member), stream
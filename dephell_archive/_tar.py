@@ -0,0 +1,34 @@
+# built-in
+from typing import Any, Iterator, Tuple
+
+
+def iter_members(descriptor, offset: int = 0) -> Iterator[Tuple[Any, int]]:
+    """Iterate over members of TarFile starting from `offset`, loading them on demand.
+
+    `TarFile.getmembers` reads headers of all members in the archive.
+    For compressed archives it means decompression of the whole archive.
+    This iterator yields already loaded members and then loads the rest
+    one by one, so the scan can be stopped at any point. Every member is yielded
+    with the offset of the next header. The scan can be resumed from it
+    later, even with another TarFile of the same archive, and headers
+    before the offset aren't parsed again.
+    """
+    loaded = [member for member in descriptor.members if member.offset >= offset]
+    for number, member in enumerate(loaded, start=1):
+        if number < len(loaded):
+            yield member, loaded[number].offset
+        else:
+            yield member, descriptor.offset
+    if descriptor._loaded:
+        return
+
+    # `firstmember` is already in the members list, don't read it twice
+    descriptor.firstmember = None
+    if descriptor.offset < offset:
+        # `TarFile.next` seeks to the offset before reading the header
+        descriptor.offset = offset
+    while True:
+        member = descriptor.next()
+        if member is None:
+            return
+        yield member, descriptor.offset
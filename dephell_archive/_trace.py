@@ -0,0 +1,175 @@
+# built-in
+import os
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from pathlib import Path
+from time import perf_counter, time
+from typing import IO, Callable, Iterator, Optional, Union
+
+
+# set the variable to a file path to trace all processes, like scan() workers
+ENV_VAR = 'DEPHELL_ARCHIVE_TRACE'
+
+
+class Tracer:
+    """Writes access log of ArchivePath operations as JSON lines.
+
+    Every record has the time, archive path, member path ('' for the archive root),
+    operation name, latency in seconds, and the number of bytes read.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        # import it only when needed, tracing is opt-in
+        from threading import Lock, local
+
+        self._stream = None  # type: Optional[IO[str]]
+        self._lock = Lock()
+        # nesting level of traced calls in the current thread,
+        # only the outermost call is recorded, so `read_bytes` isn't also traced as `open`
+        self.calls = local()
+
+    def record(self, archive: str, member: str, operation: str, latency: float, size: int = 0) -> None:
+        # import it only when needed, tracing is opt-in
+        from json import dumps
+
+        line = dumps(dict(
+            ts=round(time(), 6),
+            archive=archive,
+            member=member,
+            op=operation,
+            latency=round(latency, 6),
+            bytes=size,
+        ))
+        with self._lock:
+            if self._stream is None:
+                # line buffered appends from different processes don't mix
+                self._stream = self.path.open('a', buffering=1, encoding='utf-8')
+            self._stream.write(line + '\n')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+
+_tracer = None  # type: Optional[Tracer]
+if os.environ.get(ENV_VAR):
+    _tracer = Tracer(path=os.environ[ENV_VAR])
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+@contextmanager
+def _outermost(tracer: Tracer) -> Iterator[bool]:
+    depth = getattr(tracer.calls, 'depth', 0)
+    tracer.calls.depth = depth + 1
+    try:
+        yield depth == 0
+    finally:
+        tracer.calls.depth = depth
+
+
+@contextmanager
+def trace(path: Union[Path, str]) -> Iterator[Tracer]:
+    """Record all ArchivePath operations inside of the context into the file.
+    """
+    global _tracer
+    previous = _tracer
+    tracer = Tracer(path=path)
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+        tracer.close()
+
+
+def _record(path, operation: str, start: float, size: int = 0) -> None:
+    if _tracer is None:
+        return
+    member = '' if path._is_root else path.member_path.as_posix()
+    _tracer.record(
+        archive=str(path.archive_path),
+        member=member,
+        operation=operation,
+        latency=perf_counter() - start,
+        size=size,
+    )
+
+
+def traced(operation: str) -> Callable:
+    """Trace a method. If it returns bytes or text, their size is recorded.
+    """
+    def wrapper(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapped(self, *args, **kwargs):
+            if _tracer is None:
+                return func(self, *args, **kwargs)
+            with _outermost(_tracer) as outermost:
+                start = perf_counter()
+                result = func(self, *args, **kwargs)
+            if outermost:
+                size = len(result) if isinstance(result, (bytes, str)) else 0
+                _record(path=self, operation=operation, start=start, size=size)
+            return result
+        return wrapped
+    return wrapper
+
+
+def traced_iterator(operation: str) -> Callable:
+    """Trace a generator method. The latency covers the whole iteration.
+
+    Calls made by the consumer between items aren't nested into the iteration.
+    """
+    def wrapper(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapped(self, *args, **kwargs):
+            if _tracer is None:
+                yield from func(self, *args, **kwargs)
+                return
+            tracer = _tracer
+            iterator = func(self, *args, **kwargs)
+            outermost = getattr(tracer.calls, 'depth', 0) == 0
+            start = perf_counter()
+            try:
+                while True:
+                    with _outermost(tracer):
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                if outermost:
+                    _record(path=self, operation=operation, start=start)
+        return wrapped
+    return wrapper
+
+
+@contextmanager
+def _trace_entering(context, tracer: Tracer, path, operation: str):
+    with ExitStack() as stack:
+        with _outermost(tracer) as outermost:
+            start = perf_counter()
+            result = stack.enter_context(context)
+        if outermost:
+            _record(path=path, operation=operation, start=start)
+        yield result
+
+
+def traced_context(operation: str) -> Callable:
+    """Trace a context manager method. The latency covers only entering the context.
+    """
+    def wrapper(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapped(self, *args, **kwargs):
+            context = func(self, *args, **kwargs)
+            if _tracer is None:
+                return context
+            return _trace_entering(context=context, tracer=_tracer, path=self, operation=operation)
+        return wrapped
+    return wrapper
@@ -0,0 +1,245 @@
+# built-in
+import io
+from struct import Struct
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+
+# the same as zipfile.ZIP_STORED, zipfile isn't imported to keep the import fast
+ZIP_STORED = 0
+
+# local file header, see zipfile.structFileHeader
+_HEADER = Struct('<4s2B4HL2L2H')
+_FILENAME_LENGTH = 10
+_EXTRA_FIELD_LENGTH = 11
+
+# central directory file header, see zipfile.structCentralDir
+_CD_HEADER = Struct('<4s4B4HL2L5H2L')
+_EOCD = Struct('<4s4H2LH')                  # end of central directory record
+_ZIP64_LOCATOR = Struct('<4sLQL')           # zip64 end of central directory locator
+_ZIP64_EOCD = Struct('<4sQ2H2L4Q')          # zip64 end of central directory record
+_MAX_COMMENT = 0xFFFF
+_ZIP64_LIMIT = 0xFFFFFFFF
+_EXTRA_HEADER = Struct('<2H')
+_ZIP64_EXTRA = 0x0001
+_FLAG_UTF8 = 0x800
+# how much to read at once when skipping compressed data
+_CHUNK_SIZE = 64 * 1024
+
+
+def open_member(descriptor, info):
+    """Open zip member as a seekable binary stream.
+
+    Stored (not compressed) members are read directly from the archive file,
+    so seek is free. Compressed members are decompressed by `ZipFile.open`
+    only up to the requested position, and the decompressor state is kept
+    between sequential reads.
+    """
+    if info.compress_type != ZIP_STORED or info.flag_bits & 0x1:
+        stream = descriptor.open(info)
+        if stream.seekable():
+            return stream
+        # ZipExtFile supports seek only since python 3.7
+        return io.BufferedReader(CompressedMember(descriptor=descriptor, info=info, stream=stream))  # type: ignore
+    raw = StoredMember(fileobj=descriptor.fp, info=info)
+    return io.BufferedReader(raw)  # type: ignore
+
+
+class StoredMember(io.RawIOBase):
+    def __init__(self, fileobj, info) -> None:
+        self.fileobj = fileobj
+        self.size = info.file_size
+        self.position = 0
+
+        fileobj.seek(info.header_offset)
+        header = _HEADER.unpack(fileobj.read(_HEADER.size))
+        if header[0] != b'PK\x03\x04':
+            from zipfile import BadZipFile
+            raise BadZipFile('Bad magic number for file header')
+        self.offset = info.header_offset + _HEADER.size
+        self.offset += header[_FILENAME_LENGTH] + header[_EXTRA_FIELD_LENGTH]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError('invalid whence: {}'.format(whence))
+        if position < 0:
+            raise ValueError('negative seek position: {}'.format(position))
+        self.position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.size - self.position)
+        if size <= 0:
+            return 0
+        self.fileobj.seek(self.offset + self.position)
+        content = self.fileobj.read(size)
+        buffer[:len(content)] = content
+        self.position += len(content)
+        return len(content)
+
+
+class CompressedMember(io.RawIOBase):
+    """Seekable wrapper around not seekable `ZipExtFile`.
+
+    Seek forward reads and drops the data, seek backward opens the member again.
+    """
+
+    def __init__(self, descriptor, info, stream) -> None:
+        self.descriptor = descriptor
+        self.info = info
+        self.stream = stream
+        self.size = info.file_size
+        # position of the wrapper and of the decompressed stream
+        self.position = 0
+        self.stream_position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError('invalid whence: {}'.format(whence))
+        if position < 0:
+            raise ValueError('negative seek position: {}'.format(position))
+        self.position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        if self.position < self.stream_position:
+            self.stream.close()
+            self.stream = self.descriptor.open(self.info)
+            self.stream_position = 0
+        while self.stream_position < self.position:
+            skipped = len(self.stream.read(min(self.position - self.stream_position, _CHUNK_SIZE)))
+            if not skipped:
+                return 0
+            self.stream_position += skipped
+
+        content = self.stream.read(len(buffer))
+        buffer[:len(content)] = content
+        self.position += len(content)
+        self.stream_position = self.position
+        return len(content)
+
+    def close(self) -> None:
+        self.stream.close()
+        super().close()
+
+
+class CentralDirEntry(NamedTuple):
+    name: str
+    header_offset: int
+    file_size: int
+
+
+def iter_central_directory(stream) -> Iterator[CentralDirEntry]:
+    """Read zip central directory entry by entry without `ZipFile`.
+
+    Only names, offsets and sizes are extracted, so the memory is bounded
+    regardless of the number of members. Zip64 sizes and offsets are supported.
+    """
+    stream.seek(0, io.SEEK_END)
+    found = find_central_directory(stream=stream, size=stream.tell())
+    if found is None:
+        from zipfile import BadZipFile
+        raise BadZipFile('File is not a zip file')
+    offset, cd_size, _record = found
+    stream.seek(offset)
+    end = offset + cd_size
+    while offset < end:
+        header = stream.read(_CD_HEADER.size)
+        if len(header) != _CD_HEADER.size or header[:4] != b'PK\x01\x02':
+            from zipfile import BadZipFile
+            raise BadZipFile('Bad magic number for central directory')
+        fields = _CD_HEADER.unpack(header)
+        flags, compress_size, file_size = fields[5], fields[10], fields[11]
+        name_size, extra_size, comment_size = fields[12], fields[13], fields[14]
+        header_offset = fields[18]
+
+        raw_name = stream.read(name_size)
+        extra = stream.read(extra_size)
+        stream.seek(comment_size, io.SEEK_CUR)
+        offset += _CD_HEADER.size + name_size + extra_size + comment_size
+
+        if _ZIP64_LIMIT in (file_size, compress_size, header_offset):
+            file_size, header_offset = _parse_zip64_extra(
+                extra=extra,
+                file_size=file_size,
+                compress_size=compress_size,
+                header_offset=header_offset,
+            )
+        name = raw_name.decode('utf-8' if flags & _FLAG_UTF8 else 'cp437')
+        yield CentralDirEntry(name=name, header_offset=header_offset, file_size=file_size)
+
+
+def _parse_zip64_extra(extra: bytes, file_size: int, compress_size: int, header_offset: int) -> Tuple[int, int]:
+    position = 0
+    while position + _EXTRA_HEADER.size <= len(extra):
+        kind, size = _EXTRA_HEADER.unpack_from(extra, position)
+        position += _EXTRA_HEADER.size
+        if kind != _ZIP64_EXTRA:
+            position += size
+            continue
+        # only overflowed values are present, in this order
+        values = iter(Struct('<{}Q'.format(size // 8)).unpack_from(extra, position))
+        if file_size == _ZIP64_LIMIT:
+            file_size = next(values)
+        if compress_size == _ZIP64_LIMIT:
+            next(values)
+        if header_offset == _ZIP64_LIMIT:
+            header_offset = next(values)
+        break
+    return file_size, header_offset
+
+
+def find_central_directory(stream, size: int) -> Optional[Tuple[int, int, bytes]]:
+    """Returns offset and size of zip central directory and the EOCD record.
+    """
+    tail_size = min(size, _EOCD.size + _MAX_COMMENT)
+    stream.seek(size - tail_size)
+    tail = stream.read(tail_size)
+    position = tail.rfind(b'PK\x05\x06')
+    if position < 0 or position + _EOCD.size > len(tail):
+        return None
+    record = tail[position:position + _EOCD.size]
+    eocd_offset = size - tail_size + position
+    cd_size = _EOCD.unpack(record)[5]
+
+    locator_offset = position - _ZIP64_LOCATOR.size
+    if locator_offset >= 0 and tail[locator_offset:locator_offset + 4] == b'PK\x06\x07':
+        # zip64: sizes and offsets in EOCD can be just 0xFFFFFFFF
+        zip64_offset = _ZIP64_LOCATOR.unpack(tail[locator_offset:position])[2]
+        stream.seek(zip64_offset)
+        zip64_record = stream.read(_ZIP64_EOCD.size)
+        if zip64_record[:4] != b'PK\x06\x06':
+            return None
+        cd_size = _ZIP64_EOCD.unpack(zip64_record)[8]
+        # there can be data before the archive, so the offset from the record can't be trusted
+        return eocd_offset - _ZIP64_LOCATOR.size - _ZIP64_EOCD.size - cd_size, cd_size, record + zip64_record
+    return eocd_offset - cd_size, cd_size, record
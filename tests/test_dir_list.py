@@ -2,7 +2,7 @@
 import pytest
 
 # project
-from dephell_archive._stream import _dir_list
+from dephell_archive._index import _dir_list
 
 
 @pytest.mark.parametrize('paths, results', [
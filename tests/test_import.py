@@ -0,0 +1,68 @@
+# built-in
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+# external
+import pytest
+
+
+# milliseconds, for the whole `import dephell_archive`, the best of a few runs.
+# Wall-clock time depends on the machine, so it's checked only if the budget is set.
+IMPORT_BUDGET = os.environ.get('DEPHELL_ARCHIVE_IMPORT_BUDGET')
+
+# imported only when an archive of the format is opened or a feature is used
+LAZY_MODULES = {
+    'array',
+    'attr',
+    'bz2',
+    'gzip',
+    'hashlib',
+    'json',
+    'lzma',
+    'mmap',
+    'multiprocessing',
+    'tarfile',
+    'threading',
+    'traceback',
+    'urllib.request',
+    'zipfile',
+}
+
+root_path = Path(__file__).parent.parent
+
+
+def get_import_times() -> dict:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import dephell_archive'],
+        cwd=str(root_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.skipif(platform.python_implementation() != 'CPython', reason='-X importtime is CPython only')
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='-X importtime is added in Python 3.7')
+def test_lazy_imports():
+    times = get_import_times()
+    assert 'dephell_archive' in times
+    assert not LAZY_MODULES & set(times)
+
+
+@pytest.mark.skipif(platform.python_implementation() != 'CPython', reason='-X importtime is CPython only')
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='-X importtime is added in Python 3.7')
+@pytest.mark.skipif(not IMPORT_BUDGET, reason='set DEPHELL_ARCHIVE_IMPORT_BUDGET (ms) to check')
+def test_import_time():
+    best = min(get_import_times()['dephell_archive'] for _ in range(3))
+    assert best < float(IMPORT_BUDGET or 0) * 1000
@@ -0,0 +1,65 @@
+# built-in
+import tarfile
+from io import BytesIO
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from dephell_archive import ArchivePath
+from dephell_archive._index import normalize
+
+
+wheel_path = Path(__file__).parent / 'requirements' / 'wheel.whl'
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('', ''),
+    ('.', ''),
+    ('./', ''),
+    ('foo', 'foo'),
+    ('foo/', 'foo'),
+    ('./foo/bar', 'foo/bar'),
+    ('./foo/bar/', 'foo/bar'),
+])
+def test_normalize(name, expected):
+    assert normalize(name) == expected
+
+
+def test_index_is_shared(tmpdir, monkeypatch):
+    path = ArchivePath(
+        archive_path=wheel_path,
+        cache_path=Path(str(tmpdir)),
+    )
+    assert (path / 'dephell' / '__init__.py').exists()
+    assert path._index.complete
+
+    def fail(self):
+        raise AssertionError('archive must not be opened')
+
+    monkeypatch.setattr(ArchivePath, 'get_descriptor', fail)
+    assert (path / 'dephell' / '__init__.py').is_file()
+    assert (path / 'dephell').is_dir()
+    assert not (path / 'dephell').is_file()
+    assert not (path / 'dephell' / 'junk.py').exists()
+
+
+def test_tar_dot_prefix_and_implicit_dirs(tmpdir):
+    archive_path = Path(str(tmpdir), 'dot.tar')
+    with tarfile.open(str(archive_path), mode='w') as archive:
+        for name in ('./pkg/setup.py', './pkg/src/__init__.py'):
+            info = tarfile.TarInfo(name=name)
+            info.size = 4
+            archive.addfile(info, BytesIO(b'test'))
+
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+    assert (path / 'pkg' / 'setup.py').is_file()
+    assert not path._index.complete
+    assert (path / 'pkg' / 'src').is_dir()
+    assert not (path / 'pkg' / 'src').is_file()
+    assert not (path / 'pkg' / 'junk').exists()
+    assert (path / 'pkg' / 'src' / '__init__.py').read_text() == 'test'
@@ -0,0 +1,70 @@
+# built-in
+import zipfile
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from dephell_archive import ArchivePath
+from dephell_archive._listing import MemberTable
+from dephell_archive._zip import _parse_zip64_extra
+
+
+requirements_path = Path(__file__).parent / 'requirements'
+
+
+def make_table() -> MemberTable:
+    table = MemberTable()
+    table.add('pkg/', is_dir=True)
+    table.add('pkg/__init__.py', offset=10, size=100)
+    table.add('pkg/sub/mod.py', offset=20, size=200)
+    table.add('./README.md', offset=30, size=300)
+    table.add('.')
+    return table
+
+
+def test_table():
+    table = make_table()
+    assert len(table) == 4
+    assert [table.get_path(number) for number in range(len(table))] == [
+        'pkg',
+        'pkg/__init__.py',
+        'pkg/sub/mod.py',
+        'README.md',
+    ]
+    assert list(table.iter_members()) == [
+        ('pkg', True),
+        ('pkg/__init__.py', False),
+        ('pkg/sub/mod.py', False),
+        ('README.md', False),
+    ]
+    assert list(table.iter_members('pkg')) == [('__init__.py', False), ('sub/mod.py', False)]
+    assert list(table.iter_members('pkg/sub/')) == [('mod.py', False)]
+    assert list(table.iter_members('junk')) == []
+    assert list(table.iter_implicit_dirs()) == ['pkg/sub']
+    assert list(table.iter_implicit_dirs('pkg')) == ['sub']
+    assert list(table.iter_implicit_dirs('pkg/sub')) == []
+
+
+@pytest.mark.parametrize('name', ['wheel.whl', 'dnspython-1.16.0.zip', 'graphviz-0.13.2.zip'])
+def test_table_matches_zipfile(tmpdir, name):
+    path = ArchivePath(
+        archive_path=requirements_path / name,
+        cache_path=Path(str(tmpdir)),
+    )
+    table = path._get_table()
+    with zipfile.ZipFile(str(requirements_path / name)) as descriptor:
+        infos = descriptor.infolist()
+    assert [table.get_path(number) for number in range(len(table))] == [info.filename.rstrip('/') for info in infos]
+    assert list(table.offsets) == [info.header_offset for info in infos]
+    assert list(table.sizes) == [info.file_size for info in infos]
+
+
+def test_parse_zip64_extra():
+    limit = 0xFFFFFFFF
+    extra = b'\x01\x00\x10\x00' + (2 ** 33).to_bytes(8, 'little') + (2 ** 34).to_bytes(8, 'little')
+    # unknown extra field before zip64 one
+    extra = b'\x55\x54\x01\x00\x00' + extra
+    assert _parse_zip64_extra(extra, file_size=limit, compress_size=10, header_offset=limit) == (2 ** 33, 2 ** 34)
+    assert _parse_zip64_extra(extra, file_size=5, compress_size=limit, header_offset=limit) == (5, 2 ** 34)
@@ -0,0 +1,119 @@
+# built-in
+import shutil
+import tarfile
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from dephell_archive import ArchivePath
+
+
+requirements_path = Path(__file__).parent / 'requirements'
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('wheel.whl', 'Name: dephell'),
+    ('sdist.tar.gz', 'Name: dephell'),
+    ('dnspython-1.16.0.zip', 'Name: dnspython'),
+    ('graphviz-0.13.2.zip', 'Name: graphviz'),
+])
+def test_read_metadata(tmpdir, name, expected):
+    path = ArchivePath(
+        archive_path=requirements_path / name,
+        cache_path=Path(str(tmpdir)),
+    )
+    content = path.read_metadata()
+    assert expected in content
+    # nothing is extracted
+    assert not list(Path(str(tmpdir)).iterdir())
+
+
+def test_read_metadata_wheel_name(tmpdir):
+    archive_path = Path(str(tmpdir), 'dephell-0.2.0-py3-none-any.whl')
+    shutil.copy(str(requirements_path / 'wheel.whl'), str(archive_path))
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+    assert 'Version: 0.2.0' in path.read_metadata()
+
+
+def test_read_metadata_stops_scan(tmpdir):
+    path = ArchivePath(
+        archive_path=requirements_path / 'sdist.tar.gz',
+        cache_path=Path(str(tmpdir)),
+    )
+    assert 'Name: dephell' in path.read_metadata()
+    index = path._index
+    assert not index.complete
+    # egg-info/PKG-INFO is before, but it's not the sdist metadata
+    assert 'dephell-0.2.0/dephell.egg-info/PKG-INFO' in index.entries
+    assert index.scanned == 11
+
+
+def test_read_metadata_cached(tmpdir, monkeypatch):
+    path = ArchivePath(
+        archive_path=requirements_path / 'wheel.whl',
+        cache_path=Path(str(tmpdir)),
+    )
+    content = path.read_metadata()
+
+    def fail(self):
+        raise AssertionError('archive must not be opened')
+
+    monkeypatch.setattr(ArchivePath, 'get_descriptor', fail)
+    other = ArchivePath(
+        archive_path=requirements_path / 'wheel.whl',
+        cache_path=Path(str(tmpdir), 'other'),
+    )
+    assert other.read_metadata() == content
+
+
+@pytest.mark.parametrize('suffix', ['.whl', '.tar'])
+def test_read_metadata_missing(tmpdir, suffix):
+    archive_path = Path(str(tmpdir), 'empty' + suffix)
+    if suffix == '.whl':
+        with zipfile.ZipFile(str(archive_path), mode='w') as descriptor:
+            descriptor.writestr('pkg/__init__.py', '')
+    else:
+        with tarfile.open(str(archive_path), mode='w') as descriptor:
+            info = tarfile.TarInfo(name='pkg/__init__.py')
+            descriptor.addfile(info, BytesIO(b''))
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+    assert path.read_metadata() is None
+    assert path.read_metadata() is None
+
+
+def test_read_metadata_latin1(tmpdir):
+    archive_path = Path(str(tmpdir), 'old-1.0.tar')
+    content = 'Metadata-Version: 1.0\nName: old\nAuthor: Jürgen\n'.encode('latin-1')
+    with tarfile.open(str(archive_path), mode='w') as descriptor:
+        info = tarfile.TarInfo(name='old-1.0/PKG-INFO')
+        info.size = len(content)
+        descriptor.addfile(info, BytesIO(content))
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+    assert 'Author: Jürgen' in path.read_metadata()
+
+
+def test_read_metadata_skips_egg_info(tmpdir):
+    archive_path = Path(str(tmpdir), 'egg-1.0.tar')
+    with tarfile.open(str(archive_path), mode='w') as descriptor:
+        for name, content in [('egg.egg-info/PKG-INFO', b'Name: egg-info'), ('PKG-INFO', b'Name: egg')]:
+            info = tarfile.TarInfo(name=name)
+            info.size = len(content)
+            descriptor.addfile(info, BytesIO(content))
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+    assert path.read_metadata() == 'Name: egg'
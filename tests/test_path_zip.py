@@ -1,5 +1,8 @@
 # built-in
-from pathlib import Path
+from pathlib import Path, PurePath
+
+# external
+import pytest
 
 # project
 from dephell_archive import ArchivePath
@@ -241,3 +244,25 @@ def test_iterdir_recursive_wheel(tmpdir):
 
     for path in paths:
         assert paths.count(path) == 1, 'duplicate dir: ' + path
+
+
+def test_positional_args(tmpdir):
+    # the 4th positional argument is still the descriptor
+    with pytest.raises(TypeError):
+        ArchivePath(wheel_path, Path(str(tmpdir)), PurePath(), None, None)
+    path = ArchivePath(wheel_path, Path(str(tmpdir)), PurePath('dephell'), None)
+    assert path.is_dir()
+
+
+def test_compare(tmpdir):
+    path = ArchivePath(
+        archive_path=wheel_path,
+        cache_path=Path(str(tmpdir)),
+    )
+    paths = list(path.glob('*/*.py'))
+    assert len(paths) > 1
+    assert sorted(paths) == sorted(paths, key=lambda path: path.member_path)
+    assert path / 'a' < path / 'b' <= path / 'b'
+    assert path / 'b' > path / 'a' >= path / 'a'
+    assert path / 'a' == path / 'a'
+    assert path / 'a' != path.copy(check_interval=0) / 'a'
@@ -0,0 +1,99 @@
+# built-in
+import io
+import os
+import zipfile
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from dephell_archive import ArchivePath
+from dephell_archive._zip import CompressedMember, StoredMember
+
+
+sdist_path = Path(__file__).parent / 'requirements' / 'sdist.tar.gz'
+CONTENT = os.urandom(64 * 1024) + bytes(range(256)) * 256
+
+
+@pytest.fixture()
+def archive(tmpdir) -> ArchivePath:
+    archive_path = Path(str(tmpdir), 'data.zip')
+    with zipfile.ZipFile(str(archive_path), mode='w') as descriptor:
+        descriptor.writestr('stored.bin', CONTENT, compress_type=zipfile.ZIP_STORED)
+        descriptor.writestr('deflated.bin', CONTENT, compress_type=zipfile.ZIP_DEFLATED)
+    return ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+
+
+@pytest.mark.parametrize('name', ['stored.bin', 'deflated.bin'])
+@pytest.mark.parametrize('offset, length', [
+    (0, 4096),
+    (100, 10),
+    (70000, 1000),
+    (len(CONTENT) - 10, 100),
+    (len(CONTENT) + 10, 100),
+])
+def test_read_range_zip(archive, name, offset, length):
+    subpath = archive / name
+    assert subpath.read_range(offset, length) == CONTENT[offset:offset + length]
+    # nothing is extracted
+    assert not (subpath.cache_path / name).exists()
+
+
+def test_stored_member_is_read_directly(archive):
+    with (archive / 'stored.bin').open('rb') as stream:
+        stream.seek(1000)
+        assert isinstance(stream._stream.raw, StoredMember)
+        assert stream.read(10) == CONTENT[1000:1010]
+
+
+def test_sequential_reads(archive):
+    with (archive / 'deflated.bin').open('rb') as stream:
+        assert stream.tell() == 0
+        assert stream.read(100) == CONTENT[:100]
+        assert stream.read(100) == CONTENT[100:200]
+        assert stream.tell() == 200
+        stream.seek(-10, 1)
+        assert stream.read(20) == CONTENT[190:210]
+        assert stream.read() == CONTENT[210:]
+
+
+def test_read_range_cached(archive):
+    subpath = archive / 'deflated.bin'
+    assert subpath.read_bytes() == CONTENT
+    assert (subpath.cache_path / 'deflated.bin').exists()
+    assert subpath.read_range(10, 10) == CONTENT[10:20]
+
+
+def test_read_range_tar(tmpdir):
+    path = ArchivePath(
+        archive_path=sdist_path,
+        cache_path=Path(str(tmpdir)),
+    )
+    subpath = path / 'dephell-0.2.0' / 'setup.py'
+    content = subpath.read_range(0, 200)
+    assert len(content) == 200
+    assert content == subpath.read_bytes()[:200]
+
+
+def test_read_range_missing(archive):
+    with pytest.raises(FileNotFoundError):
+        (archive / 'junk.bin').read_range(0, 10)
+
+
+def test_compressed_member(archive):
+    # used on python 3.6, where ZipExtFile isn't seekable
+    with zipfile.ZipFile(str(archive.archive_path)) as descriptor:
+        info = descriptor.getinfo('deflated.bin')
+        raw = CompressedMember(descriptor=descriptor, info=info, stream=descriptor.open(info))
+        with io.BufferedReader(raw) as stream:
+            stream.seek(70000)
+            assert stream.read(10) == CONTENT[70000:70010]
+            stream.seek(100)
+            assert stream.read(10) == CONTENT[100:110]
+            stream.seek(-10, io.SEEK_END)
+            assert stream.read() == CONTENT[-10:]
+            assert stream.read(10) == b''
@@ -0,0 +1,74 @@
+# built-in
+import pickle
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from dephell_archive import ArchivePath, scan
+
+
+wheel_path = Path(__file__).parent / 'requirements' / 'wheel.whl'
+sdist_path = Path(__file__).parent / 'requirements' / 'sdist.tar.gz'
+
+
+def read_init(path: ArchivePath) -> int:
+    subpath = path / 'dephell' / '__init__.py'
+    if not subpath.exists():
+        subpath = path / 'dephell-0.2.0' / 'dephell' / '__init__.py'
+    return len(subpath.read_text())
+
+
+def test_pickle(tmpdir):
+    path = ArchivePath(
+        archive_path=wheel_path,
+        cache_path=Path(str(tmpdir)),
+    )
+    subpath = path / 'dephell'
+    with subpath.get_descriptor():
+        restored = pickle.loads(pickle.dumps(subpath))
+    assert restored._descriptor is None
+    assert restored.member_path == subpath.member_path
+    assert restored.is_dir()
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('ordered', [True, False])
+def test_scan(tmpdir, workers, ordered):
+    archives = [
+        ArchivePath(archive_path=wheel_path, cache_path=Path(str(tmpdir), 'wheel')),
+        ArchivePath(archive_path=Path('missing.whl'), cache_path=Path(str(tmpdir), 'missing')),
+        ArchivePath(archive_path=sdist_path, cache_path=Path(str(tmpdir), 'sdist')),
+    ]
+    results = list(scan(archives, read_init, workers=workers, ordered=ordered))
+    assert len(results) == 3
+    if not ordered:
+        results.sort(key=lambda result: archives.index(result.archive))
+
+    assert results[0].ok
+    assert results[0].result > 0
+    assert not results[1].ok
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert 'FileNotFoundError' in results[1].traceback
+    assert results[2].ok
+    assert results[2].result > 0
+
+
+class UnpicklableError(Exception):
+    # not all args are passed into `super().__init__`, so unpickling fails
+    def __init__(self, message, name):  # noqa: B042
+        super().__init__(message)
+
+
+def raise_unpicklable(path: ArchivePath) -> None:
+    raise UnpicklableError('oh no', path.name)
+
+
+def test_scan_unpicklable_error(tmpdir):
+    archives = [ArchivePath(archive_path=wheel_path, cache_path=Path(str(tmpdir)))]
+    results = list(scan(archives, raise_unpicklable, workers=2))
+    assert len(results) == 1
+    assert isinstance(results[0].error, RuntimeError)
+    assert 'oh no' in str(results[0].error)
+    assert 'UnpicklableError' in results[0].traceback
@@ -0,0 +1,218 @@
+# built-in
+import io
+import pickle
+import re
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from threading import Thread
+
+# external
+import pytest
+
+# project
+from dephell_archive import PROFILES, ArchivePath, BufferSource, FileSource, HTTPSource, IOProfile
+
+
+requirements_path = Path(__file__).parent / 'requirements'
+wheel_path = requirements_path / 'wheel.whl'
+zip_path = requirements_path / 'dnspython-1.16.0.zip'
+sdist_path = requirements_path / 'sdist.tar.gz'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # set by the fixture
+    requests = []  # type: list
+    supports_ranges = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _get_content(self):
+        path = requirements_path / self.path.lstrip('/')
+        if not path.is_file():
+            self.send_error(404)
+            return None
+        return path.read_bytes()
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        content = self._get_content()
+        if content is None:
+            return
+        self.requests.append(('HEAD', None, 0))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+
+    def do_GET(self) -> None:  # noqa: N802
+        content = self._get_content()
+        if content is None:
+            return
+        header = self.headers.get('Range')
+        if header is None or not self.supports_ranges:
+            self.requests.append(('GET', None, len(content)))
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        start, end = map(int, re.fullmatch(r'bytes=(\d+)-(\d+)', header).groups())
+        body = content[start:end + 1]
+        self.requests.append(('GET', header, len(body)))
+        self.send_response(206)
+        self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end, len(content)))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def server():
+    RangeHandler.requests = []
+    httpd = HTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = Thread(target=httpd.serve_forever, kwargs=dict(poll_interval=0.01), daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}/'.format(httpd.server_port), RangeHandler.requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_buffer_source(tmpdir):
+    path = ArchivePath(
+        archive_path=Path('wheel.whl'),
+        cache_path=Path(str(tmpdir)),
+        source=BufferSource(data=wheel_path.read_bytes()),
+    )
+    subpath = path / 'dephell' / '__init__.py'
+    assert subpath.is_file()
+    assert 'from .controllers' in subpath.read_text()
+
+
+def test_http_source_wheel(tmpdir, server):
+    url, _requests = server
+    path = ArchivePath(
+        archive_path=Path('wheel.whl'),
+        cache_path=Path(str(tmpdir)),
+        source=HTTPSource(url=url + 'wheel.whl'),
+    )
+    paths = list(path.glob('*/__init__.py'))
+    assert len(paths) == 1
+    assert 'from .controllers' in paths[0].read_text()
+
+
+def test_http_source_reads_only_needed_blocks(tmpdir, server):
+    url, requests = server
+    source = HTTPSource(url=url + 'dnspython-1.16.0.zip', block_size=4 * 1024)
+    path = ArchivePath(
+        archive_path=Path('dnspython-1.16.0.zip'),
+        cache_path=Path(str(tmpdir)),
+        source=source,
+    )
+    content = (path / 'dnspython-1.16.0' / 'PKG-INFO').read_text()
+    assert 'Name: dnspython' in content
+
+    fetched = sum(size for _method, _range, size in requests)
+    assert fetched < zip_path.stat().st_size / 4
+
+    # blocks are cached between descriptors
+    count = len(requests)
+    assert (path / 'dnspython-1.16.0' / 'setup.py').exists()
+    assert len(requests) == count
+
+
+def test_http_source_coalesces_blocks(server):
+    url, requests = server
+    source = HTTPSource(url=url + 'sdist.tar.gz', block_size=256)
+    content = sdist_path.read_bytes()
+
+    assert source.read_at(offset=100, length=1000) == content[100:1100]
+    assert requests[-1] == ('GET', 'bytes=0-1279', 1280)
+
+    # only missed blocks are requested
+    assert source.read_at(offset=1000, length=1000) == content[1000:2000]
+    assert requests[-1] == ('GET', 'bytes=1280-2047', 768)
+
+    with source.open() as stream:
+        stream.seek(-10, 2)
+        assert stream.read() == content[-10:]
+
+
+def test_http_source_tar(tmpdir, server):
+    url, _requests = server
+    path = ArchivePath(
+        archive_path=Path('sdist.tar.gz'),
+        cache_path=Path(str(tmpdir)),
+        source=HTTPSource(url=url + 'sdist.tar.gz'),
+    )
+    subpath = path / 'dephell-0.2.0' / 'setup.py'
+    assert 'from setuptools import' in subpath.read_text()
+
+
+def test_file_source_memory_threshold():
+    source = FileSource(path=sdist_path)
+    with source.open(profile=IOProfile(memory_threshold=1024 * 1024)) as stream:
+        assert isinstance(stream, io.BytesIO)
+        assert stream.read() == sdist_path.read_bytes()
+    with source.open(profile=IOProfile(memory_threshold=1024)) as stream:
+        assert not isinstance(stream, io.BytesIO)
+        assert stream.read() == sdist_path.read_bytes()
+
+
+@pytest.mark.parametrize('profile', sorted(PROFILES))
+def test_io_profiles(tmpdir, profile):
+    for archive_path, member in [(sdist_path, 'dephell-0.2.0/setup.py'), (wheel_path, 'dephell/__init__.py')]:
+        path = ArchivePath(
+            archive_path=archive_path,
+            cache_path=Path(str(tmpdir), archive_path.name),
+            io_profile=profile,
+        )
+        assert (path / member).read_text()
+
+
+def test_http_source_read_ahead(server):
+    url, requests = server
+    source = HTTPSource(url=url + 'sdist.tar.gz', block_size=256)
+    content = sdist_path.read_bytes()
+    with source.open(profile=IOProfile(read_ahead=1024)) as stream:
+        assert stream.read(10) == content[:10]
+        assert requests[-1] == ('GET', 'bytes=0-1279', 1280)
+        count = len(requests)
+        stream.seek(1000)
+        assert stream.read(200) == content[1000:1200]
+        assert len(requests) == count + 1
+
+
+def test_http_source_no_size(server, monkeypatch):
+    url, _requests = server
+
+    def send_header(self, keyword, value):
+        if keyword != 'Content-Length':
+            BaseHTTPRequestHandler.send_header(self, keyword, value)
+
+    monkeypatch.setattr(RangeHandler, 'send_header', send_header)
+    source = HTTPSource(url=url + 'wheel.whl')
+    with pytest.raises(ValueError, match='Content-Length'):
+        source.size
+
+
+def test_http_source_without_ranges(server, monkeypatch):
+    url, requests = server
+    monkeypatch.setattr(RangeHandler, 'supports_ranges', False)
+    content = sdist_path.read_bytes()
+    source = HTTPSource(url=url + 'sdist.tar.gz', block_size=256, max_blocks=2)
+    assert source.read_at(offset=0, length=10) == content[:10]
+    assert source.read_at(offset=5000, length=10) == content[5000:5010]
+    assert source.read_at(offset=300, length=3000) == content[300:3300]
+    # the whole file is downloaded once
+    assert [method for method, _range, _size in requests].count('GET') == 1
+
+
+def test_http_source_pickle(server):
+    url, _requests = server
+    source = HTTPSource(url=url + 'sdist.tar.gz', block_size=256)
+    content = source.read_at(offset=0, length=4096)
+    restored = pickle.loads(pickle.dumps(source))
+    assert restored._blocks == {}
+    assert restored._size is None
+    assert restored.url == source.url
+    assert restored.read_at(offset=0, length=4096) == content
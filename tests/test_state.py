@@ -0,0 +1,248 @@
+# built-in
+import os
+import shutil
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+
+# external
+import pytest
+
+# project
+from dephell_archive import ArchivePath
+from dephell_archive._state import MANIFESTS_DIR, get_identity
+
+
+requirements_path = Path(__file__).parent / 'requirements'
+wheel_path = requirements_path / 'wheel.whl'
+sdist_path = requirements_path / 'sdist.tar.gz'
+
+
+def test_identity(tmpdir):
+    wheel_copy = Path(str(tmpdir), 'copy.whl')
+    shutil.copy(str(wheel_path), str(wheel_copy))
+    sdist_copy = Path(str(tmpdir), 'copy.tar.gz')
+    shutil.copy(str(sdist_path), str(sdist_copy))
+
+    identity = get_identity(wheel_path, is_zip=True)
+    assert identity.startswith('zip:')
+    assert get_identity(wheel_copy, is_zip=True) == identity
+    assert get_identity(wheel_path, is_zip=True, full=True).startswith('full:')
+
+    # tar archives aren't read, copies have different identity
+    identity = get_identity(sdist_path)
+    assert identity.startswith('stat:')
+    assert get_identity(sdist_copy) != identity
+    assert get_identity(sdist_path) == identity
+
+    identity = get_identity(sdist_path, full=True)
+    assert identity.startswith('full:')
+    assert get_identity(sdist_copy, full=True) == identity
+    assert get_identity(wheel_path, is_zip=True) != identity
+
+
+def test_identity_not_zip(tmpdir):
+    path = Path(str(tmpdir), 'fake.whl')
+    path.write_bytes(b'not a zip')
+    assert get_identity(path, is_zip=True).startswith('stat:')
+
+
+def test_tar_is_not_hashed(tmpdir, monkeypatch):
+    def fail(stream):
+        raise AssertionError('archive must not be hashed')
+
+    monkeypatch.setattr('dephell_archive._state._full_digest', fail)
+    path = ArchivePath(
+        archive_path=sdist_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+    )
+    assert 'Name: dephell' in path.read_metadata()
+    assert (path / 'dephell-0.2.0' / 'setup.py').exists()
+
+
+def test_shared_state_hash_content(tmpdir):
+    sdist_copy = Path(str(tmpdir), 'copy.tar.gz')
+    shutil.copy(str(sdist_path), str(sdist_copy))
+    paths = [
+        ArchivePath(archive_path=archive_path, cache_path=Path(str(tmpdir), name), hash_content=True)
+        for name, archive_path in (('cache1', sdist_path), ('cache2', sdist_copy))
+    ]
+    assert paths[0]._get_state() is paths[1]._get_state()
+    assert (paths[0] / 'dephell-0.2.0').copy().hash_content
+
+
+def test_shared_state(tmpdir):
+    # unique content, so the state isn't shared with other tests
+    archive_path = Path(str(tmpdir), 'original.whl')
+    content = os.urandom(64).hex()
+    with zipfile.ZipFile(str(archive_path), mode='w') as descriptor:
+        descriptor.writestr('pkg/__init__.py', content)
+    archive_copy = Path(str(tmpdir), 'copy.whl')
+    shutil.copy(str(archive_path), str(archive_copy))
+
+    path1 = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache1'),
+    )
+    path2 = ArchivePath(
+        archive_path=archive_copy,
+        cache_path=Path(str(tmpdir), 'cache2'),
+    )
+    assert (path1 / 'pkg').is_dir()
+    assert path2._get_state() is path1._get_state()
+    assert path2._index.complete
+
+    assert (path1 / 'pkg' / '__init__.py').read_text() == content
+    assert Path(str(tmpdir), 'cache1', 'pkg', '__init__.py').exists()
+
+    # served from the cache of the first archive
+    assert (path2 / 'pkg' / '__init__.py').read_text() == content
+    assert not Path(str(tmpdir), 'cache2', 'pkg', '__init__.py').exists()
+
+
+def _write_zip(path: Path, content: str) -> None:
+    with zipfile.ZipFile(str(path), mode='w') as descriptor:
+        descriptor.writestr('pkg/__init__.py', content)
+        descriptor.writestr('pkg/' + content + '.py', '')
+    # make sure mtime is changed even on file systems with coarse timestamps
+    stat = path.stat()
+    os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_invalidate_changed_archive(tmpdir):
+    archive_path = Path(str(tmpdir), 'pkg.whl')
+    _write_zip(archive_path, 'old')
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+        check_interval=0,
+    )
+    subpath = path / 'pkg' / '__init__.py'
+    assert subpath.read_text() == 'old'
+    assert (path / 'pkg' / 'old.py').exists()
+    state = path._get_state()
+
+    _write_zip(archive_path, 'new')
+    assert subpath.read_text() == 'new'
+    assert state.stale
+    assert path._get_state() is not state
+    assert not (path / 'pkg' / 'old.py').exists()
+    assert (path / 'pkg' / 'new.py').exists()
+
+
+def test_invalidate_throttled(tmpdir):
+    archive_path = Path(str(tmpdir), 'pkg.whl')
+    _write_zip(archive_path, 'old')
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+        check_interval=3600,
+    )
+    subpath = path / 'pkg' / '__init__.py'
+    assert subpath.read_text() == 'old'
+
+    _write_zip(archive_path, 'new')
+    assert subpath.read_text() == 'old'
+
+    subpath._state.checked.clear()
+    assert subpath.read_text() == 'new'
+
+
+def test_touch_keeps_state(tmpdir):
+    archive_path = Path(str(tmpdir), 'pkg.whl')
+    _write_zip(archive_path, 'old')
+    path = ArchivePath(
+        archive_path=archive_path,
+        cache_path=Path(str(tmpdir), 'cache'),
+        check_interval=0,
+    )
+    assert (path / 'pkg' / '__init__.py').read_text() == 'old'
+    state = path._get_state()
+
+    stat = archive_path.stat()
+    os.utime(str(archive_path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert path._get_state() is state
+    assert not state.stale
+
+
+def test_invalidate_fresh_path(tmpdir):
+    archive_path = Path(str(tmpdir), 'pkg.whl')
+    cache_path = Path(str(tmpdir), 'cache')
+    _write_zip(archive_path, 'old')
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path, check_interval=3600)
+    assert (path / 'pkg' / '__init__.py').read_text() == 'old'
+    assert (path / 'pkg' / 'old.py').read_text() == ''
+
+    _write_zip(archive_path, 'new content')
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path, check_interval=0)
+    assert (path / 'pkg' / '__init__.py').read_text() == 'new content'
+    assert not (path / 'pkg' / 'old.py').exists()
+
+
+def test_invalidate_cache_of_another_process(tmpdir, monkeypatch):
+    archive_path = Path(str(tmpdir), 'pkg.whl')
+    cache_path = Path(str(tmpdir), 'cache')
+    _write_zip(archive_path, 'old')
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path, check_interval=3600)
+    assert (path / 'pkg' / 'old.py').read_text() == ''
+
+    # nothing is known about the archive in a new process
+    monkeypatch.setattr('dephell_archive._state._states', OrderedDict())
+    monkeypatch.setattr('dephell_archive._state._identities', OrderedDict())
+    _write_zip(archive_path, 'new')
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path, check_interval=3600)
+    assert not (path / 'pkg' / 'old.py').exists()
+    assert (path / 'pkg' / '__init__.py').read_text() == 'new'
+
+    # the cache isn't dropped if the archive isn't changed
+    monkeypatch.setattr('dephell_archive._state._states', OrderedDict())
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path, check_interval=3600)
+    assert (path / 'pkg' / '__init__.py').exists()
+    assert (cache_path / 'pkg' / '__init__.py').exists()
+
+
+def test_manifest(tmpdir):
+    archive_path = Path(str(tmpdir), 'pkg.whl')
+    _write_zip(archive_path, 'unchecked')
+
+    # written only if the archive is checked
+    cache_path = Path(str(tmpdir), 'cache1')
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path)
+    assert (path / 'pkg' / '__init__.py').read_text() == 'unchecked'
+    assert not (cache_path / MANIFESTS_DIR).exists()
+
+    # and it's not a member
+    archive_path = Path(str(tmpdir), 'pkg2.whl')
+    _write_zip(archive_path, 'checked')
+    cache_path = Path(str(tmpdir), 'cache2')
+    path = ArchivePath(archive_path=archive_path, cache_path=cache_path, check_interval=0)
+    assert (path / 'pkg' / '__init__.py').read_text() == 'checked'
+    assert (cache_path / MANIFESTS_DIR).is_dir()
+    manifest = path / MANIFESTS_DIR
+    assert not manifest.exists()
+    assert not manifest.is_dir()
+    assert not manifest.is_file()
+    assert MANIFESTS_DIR not in [subpath.name for subpath in path.iterdir()]
+    with pytest.raises(FileNotFoundError):
+        manifest.read_text()
+
+
+def test_shared_cache_dir(tmpdir, monkeypatch):
+    cache_path = Path(str(tmpdir), 'cache')
+    first_path = Path(str(tmpdir), 'first.whl')
+    second_path = Path(str(tmpdir), 'second.whl')
+    _write_zip(first_path, 'first')
+    _write_zip(second_path, 'second')
+    first = ArchivePath(archive_path=first_path, cache_path=cache_path, check_interval=3600)
+    second = ArchivePath(archive_path=second_path, cache_path=cache_path, check_interval=3600)
+    assert (first / 'pkg' / 'first.py').read_text() == ''
+    assert (second / 'pkg' / 'second.py').read_text() == ''
+
+    # every archive has own manifest, so they don't remove files of each other
+    monkeypatch.setattr('dephell_archive._state._states', OrderedDict())
+    first = ArchivePath(archive_path=first_path, cache_path=cache_path, check_interval=3600)
+    assert (first / 'pkg' / 'first.py').exists()
+    second = ArchivePath(archive_path=second_path, cache_path=cache_path, check_interval=3600)
+    assert (second / 'pkg' / 'second.py').exists()
+    assert (cache_path / 'pkg' / 'first.py').exists()
+    assert (cache_path / 'pkg' / 'second.py').exists()
@@ -0,0 +1,67 @@
+# built-in
+import hashlib
+import os
+import stat
+import tarfile
+from pathlib import Path, PurePath
+from threading import Thread
+
+# external
+import pytest
+
+# project
+from dephell_archive import iter_tar_stream
+
+
+sdist_path = Path(__file__).parent / 'requirements' / 'sdist.tar.gz'
+
+
+@pytest.fixture()
+def pipe():
+    read_fd, write_fd = os.pipe()
+
+    def feed():
+        with open(write_fd, 'wb') as stream:
+            stream.write(sdist_path.read_bytes())
+
+    thread = Thread(target=feed, daemon=True)
+    thread.start()
+    with open(read_fd, 'rb') as stream:
+        yield stream
+    thread.join()
+
+
+def test_iter_tar_stream(pipe):
+    assert not pipe.seekable()
+    hashes = dict()
+    dirs = set()
+    for member_path, member_stat, stream in iter_tar_stream(pipe):
+        if stat.S_ISDIR(member_stat.st_mode):
+            assert stream is None
+            dirs.add(member_path)
+            continue
+        assert stat.S_ISREG(member_stat.st_mode)
+        content = stream.read()
+        assert len(content) == member_stat.st_size
+        hashes[member_path] = hashlib.md5(content).hexdigest()
+
+    assert PurePath('dephell-0.2.0', 'dephell') in dirs
+    with tarfile.open(str(sdist_path)) as descriptor:
+        expected = {
+            PurePath(member.name): hashlib.md5(descriptor.extractfile(member).read()).hexdigest()
+            for member in descriptor.getmembers() if member.isfile()
+        }
+    assert hashes == expected
+
+
+def test_iter_tar_stream_glob(pipe):
+    members = list(iter_tar_stream(pipe, pattern='*/PKG-INFO', compression='gz'))
+    assert len(members) == 1
+    member_path, _stat, stream = members[0]
+    assert member_path == PurePath('dephell-0.2.0', 'PKG-INFO')
+
+
+def test_iter_tar_stream_bad_compression():
+    with open(os.devnull, 'rb') as stream:
+        with pytest.raises(ValueError, match='compression'):
+            next(iter_tar_stream(stream, compression='zip'))
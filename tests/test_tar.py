@@ -0,0 +1,56 @@
+# built-in
+import tarfile
+from pathlib import Path
+
+# project
+from dephell_archive import ArchivePath
+from dephell_archive._tar import iter_members
+
+
+sdist_path = Path(__file__).parent / 'requirements' / 'sdist.tar.gz'
+
+
+def test_iter_members():
+    with tarfile.open(str(sdist_path)) as descriptor:
+        names = [member.name for member, _offset in iter_members(descriptor)]
+    with tarfile.open(str(sdist_path)) as descriptor:
+        assert names == descriptor.getnames()
+
+
+def test_iter_members_resume():
+    with tarfile.open(str(sdist_path)) as descriptor:
+        members = iter_members(descriptor)
+        offset = next(offset for member, offset in members if member.name == 'dephell-0.2.0/PKG-INFO')
+        assert not descriptor._loaded
+        assert len(descriptor.members) == 11
+        expected = [member.name for member, _offset in members]
+
+    # a new descriptor continues from the offset without reading previous headers
+    with tarfile.open(str(sdist_path)) as descriptor:
+        names = [member.name for member, _offset in iter_members(descriptor, offset=offset)]
+        assert len(descriptor.members) == 1 + len(names)
+    assert names == expected
+    assert names[0] == 'dephell-0.2.0/dephell'
+
+
+def test_lookups_resume_scan(tmpdir, monkeypatch):
+    with tarfile.open(str(sdist_path)) as descriptor:
+        names = descriptor.getnames()
+
+    calls = []
+    original = tarfile.TarFile.next
+
+    def counted(self):
+        calls.append(1)
+        return original(self)
+
+    monkeypatch.setattr(tarfile.TarFile, 'next', counted)
+    path = ArchivePath(
+        archive_path=sdist_path,
+        cache_path=Path(str(tmpdir)),
+    )
+    # every lookup opens a new descriptor
+    for name in names[1:10]:
+        assert (path / name).exists()
+    # one call on opening for every descriptor, and every header is read once
+    assert len(calls) <= 9 + 10
@@ -0,0 +1,116 @@
+# built-in
+import json
+from pathlib import Path
+
+# project
+from dephell_archive import ArchivePath, trace
+from dephell_archive._replay import Event, load_trace, main, replay, simulate, suggest_prefetch
+
+
+wheel_path = Path(__file__).parent / 'requirements' / 'wheel.whl'
+
+
+def _event(member: str, size: int, op: str = 'read_bytes') -> Event:
+    return Event(ts=0.0, archive='a.zip', member=member, op=op, latency=0.0, size=size)
+
+
+def test_trace_records(tmpdir):
+    trace_path = Path(str(tmpdir), 'trace.jsonl')
+    path = ArchivePath(archive_path=wheel_path, cache_path=Path(str(tmpdir), 'cache'))
+    with trace(trace_path):
+        subpath = path / 'dephell' / '__init__.py'
+        assert subpath.exists()
+        content = subpath.read_bytes()
+        list(path.iterdir())
+    # nothing is recorded outside of the context
+    path.exists()
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [record['op'] for record in records] == ['exists', 'read_bytes', 'iterdir']
+    assert records[1]['member'] == 'dephell/__init__.py'
+    assert records[1]['bytes'] == len(content)
+    assert records[2]['member'] == ''
+    for record in records:
+        assert record['archive'] == str(wheel_path)
+        assert record['latency'] >= 0
+    events = load_trace(trace_path)
+    assert len(events) == 3
+    assert events[1].size == len(content)
+
+
+def test_simulate_policies():
+    # `a` is hot, `b` and `c` are read once between its reads
+    events = [_event('a', 10), _event('b', 10), _event('a', 10), _event('c', 10), _event('a', 10)]
+    result = simulate(events, capacity=20, policy='lru')
+    assert (result.hits, result.misses) == (2, 3)
+    assert result.hit_ratio == 0.4
+    assert result.byte_hit_ratio == 0.4
+
+    # fifo evicts `a` because it was cached first
+    result = simulate(events, capacity=20, policy='fifo')
+    assert (result.hits, result.misses) == (1, 4)
+
+    result = simulate(events, capacity=20, policy='lfu')
+    assert (result.hits, result.misses) == (2, 3)
+
+    # doesn't fit at all
+    result = simulate(events, capacity=5, policy='lru')
+    assert result.hits == 0
+
+
+def test_simulate_open_size():
+    # `open` doesn't know the size, it's taken from other reads
+    events = [_event('a', 0, op='open'), _event('a', 30), _event('b', 10)]
+    result = simulate(events, capacity=35, policy='lru')
+    assert result.hits == 1
+    assert result.hit_bytes == 30
+
+
+def test_suggest_prefetch():
+    events = [_event('a', 10), _event('b', 5), _event('a', 10), _event('b', 5), _event('a', 10), _event('c', 1)]
+    assert suggest_prefetch(events) == [('a.zip', 'a', 3, 10), ('a.zip', 'b', 2, 5)]
+    assert suggest_prefetch(events, limit=1) == [('a.zip', 'a', 3, 10)]
+
+
+def test_replay(tmpdir, capsys):
+    trace_path = Path(str(tmpdir), 'trace.jsonl')
+    path = ArchivePath(archive_path=wheel_path, cache_path=Path(str(tmpdir), 'cache'))
+    with trace(trace_path):
+        (path / 'dephell' / '__init__.py').read_text()
+        path.read_metadata()
+        list(path.glob('*/*.py'))
+
+    events = load_trace(trace_path)
+    elapsed, errors = replay(events, cache_path=Path(str(tmpdir), 'replay'))
+    assert errors == 0
+    assert elapsed > 0
+
+    code = main([str(trace_path), '--sizes', '1K', '1M', '--execute', str(Path(str(tmpdir), 'replay2'))])
+    assert code == 0
+    output = capsys.readouterr().out
+    assert 'suggested cache' in output
+    assert 'errors: 0' in output
+
+
+def test_trace_nested(tmpdir):
+    trace_path = Path(str(tmpdir), 'trace.jsonl')
+    path = ArchivePath(archive_path=wheel_path, cache_path=Path(str(tmpdir), 'cache'))
+    with trace(trace_path):
+        # calls between items are recorded, internal calls are not
+        for subpath in path.iterdir():
+            subpath.is_dir()
+        with path.joinpath('dephell', '__init__.py').open('rb'):
+            pass
+    ops = [event.op for event in load_trace(trace_path)]
+    assert ops.count('iterdir') == 1
+    assert ops.count('is_dir') == len(ops) - 2
+    assert ops[-1] == 'open'
+    assert 'get_descriptor' not in ops
+
+
+def test_simulate_only_opened():
+    # the size of `b` is unknown, it doesn't get into the cache for free
+    events = [_event('a', 10), _event('b', 0, op='open'), _event('a', 10), _event('b', 0, op='open')]
+    result = simulate(events, capacity=10, policy='lru')
+    assert (result.hits, result.misses) == (1, 1)
+    assert result.byte_hit_ratio == 0.5